@@ -0,0 +1,85 @@
+import io, subprocess, sys, tempfile, time, tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image
+
+from utils.helpers import COLOUR_SAMPLE_SIZE, open_image_sample
+
+# (label, format, size): a 24 MP phone photo, plus a PNG that can't use draft().
+CASES = [
+    ("jpeg 6000x4000", "JPEG", (6000, 4000)),
+    ("png 2000x2000", "PNG", (2000, 2000)),
+]
+
+
+def make_image(fmt: str, size: tuple) -> bytes:
+    data = io.BytesIO()
+    Image.radial_gradient("L").resize(size).convert("RGB").save(data, fmt)
+    return data.getvalue()
+
+
+def full_decode(data: io.BytesIO) -> Image.Image:
+    # What image_primary_colour did before: decode everything, then shrink.
+    img = Image.open(data).convert("RGB")
+    return img.resize(COLOUR_SAMPLE_SIZE)
+
+
+def status_kib(field: str) -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    raise KeyError(field)
+
+
+def reset_peak_rss():
+    # Linux only: resets VmHWM, which imports have already pushed up.
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+
+
+def measure(path: str, case: int, mode: str):
+    label = CASES[case][0]
+    data = io.BytesIO(Path(path).read_bytes())
+    func = open_image_sample if mode == "sample" else full_decode
+
+    reset_peak_rss()
+    baseline = status_kib("VmRSS")
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(data)
+    elapsed = time.perf_counter() - start
+    _, traced = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    peak = status_kib("VmHWM")
+
+    # Pillow allocates pixel buffers outside the Python allocator, so tracemalloc
+    # only sees the Python side; the RSS growth is what the decode really costs.
+    print(
+        f"{label:<16} {mode:<7} {elapsed * 1000:8.1f} ms "
+        f"{(peak - baseline) / 1024:8.1f} MiB rss "
+        f"{traced / 1024:8.1f} KiB traced"
+    )
+
+
+def main():
+    if len(sys.argv) == 4:
+        return measure(sys.argv[1], int(sys.argv[2]), sys.argv[3])
+
+    # Each measurement runs in a fresh process that only loads the encoded
+    # file, so peak RSS isn't inflated by building the test image.
+    with tempfile.TemporaryDirectory() as tmp:
+        for case, (_, fmt, size) in enumerate(CASES):
+            path = Path(tmp) / f"{case}.{fmt.lower()}"
+            path.write_bytes(make_image(fmt, size))
+
+            for mode in ("full", "sample"):
+                subprocess.run(
+                    [sys.executable, __file__, str(path), str(case), mode], check=True
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import random, string, sys, time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.converters import get_role_index, parse_roles
+
+ROLES = 250
+WORDS = 20
+ROUNDS = 50
+
+
+def make_guild(count: int) -> SimpleNamespace:
+    rng = random.Random(0)
+    roles = [SimpleNamespace(id=0, name="@everyone")]
+
+    for i in range(1, count + 1):
+        words = rng.randint(1, 3)
+        name = " ".join(
+            "".join(rng.choices(string.ascii_letters, k=rng.randint(3, 8)))
+            for _ in range(words)
+        )
+        roles.append(SimpleNamespace(id=i, name=name))
+
+    return SimpleNamespace(id=1, roles=roles, get_role=lambda _id: None)
+
+
+def make_words(guild: SimpleNamespace, count: int) -> list:
+    rng = random.Random(1)
+    words = []
+    while len(words) < count:
+        if rng.random() < 0.8:
+            words.extend(rng.choice(guild.roles[1:]).name.split())
+        else:
+            words.append("".join(rng.choices(string.ascii_lowercase, k=6)))
+    return words[:count]
+
+
+def make_typos(words: list) -> list:
+    # Drop a letter from every third word so phrases miss the exact trie path.
+    return [w[:-1] if i % 3 == 0 and len(w) > 3 else w for i, w in enumerate(words)]
+
+
+def check_multiword_typo():
+    guild = SimpleNamespace(
+        id=2,
+        roles=[
+            SimpleNamespace(id=0, name="@everyone"),
+            SimpleNamespace(id=1, name="Red Team"),
+            SimpleNamespace(id=2, name="Moderator"),
+            SimpleNamespace(id=3, name="Temp"),
+        ],
+        get_role=lambda _id: None,
+    )
+    results = parse_roles(guild, ["red", "tem"])
+    assert [role.name for role, _ in results] == ["Red Team"], results
+    print("multi-word typo: 'red tem' -> 'Red Team'")
+
+    # A typo followed by valid names must not swallow them into one span.
+    guild.roles += [
+        SimpleNamespace(id=4, name="Helper"),
+        SimpleNamespace(id=5, name="Muted"),
+    ]
+    results = parse_roles(guild, ["modd", "helper", "muted"])
+    names = [role.name if role else None for role, _ in results]
+    assert names == ["Moderator", "Helper", "Muted"], results
+    print("typo then names: 'modd helper muted' -> " + ", ".join(names))
+
+
+def quadratic(index, words: list) -> list:
+    # The span-by-span search role_group used before the phrase parser.
+    results = []
+    i = 0
+    while i < len(words):
+        for j in range(len(words), i, -1):
+            role = index.find(" ".join(words[i:j]))
+            if role:
+                results.append(role)
+                i = j
+                break
+        else:
+            i += 1
+    return results
+
+
+def bench(label: str, func, *args):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        func(*args)
+    elapsed = (time.perf_counter() - start) / ROUNDS
+    print(f"{label:<12} {elapsed * 1000:8.2f} ms/call")
+
+
+def main():
+    guild = make_guild(ROLES)
+    index = get_role_index(guild)
+    words = make_words(guild, WORDS)
+
+    print(f"{ROLES} roles x {WORDS} words, {ROUNDS} rounds")
+    bench("span search", quadratic, index, words)
+    bench("trie", parse_roles, guild, words)
+
+    typos = make_typos(words)
+    bench("span typos", quadratic, index, typos)
+    bench("trie typos", parse_roles, guild, typos)
+
+    check_multiword_typo()
+
+
+if __name__ == "__main__":
+    main()
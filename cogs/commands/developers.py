@@ -1,11 +1,11 @@
-import discord, os, logging, asyncio, random
+import discord, logging, random, time
 from discord.ext import commands
 
 from typing import Optional, Union
-from rapidfuzz import process, fuzz
 
 from utils import views, checks
 from utils.messages import Embeds, Emojis, Colours
+from utils.lookup import NameIndex
 
 from main import Bot
 
@@ -35,6 +35,7 @@ class Developers(commands.Cog):
                 "emoji": "<:crypto:1448192570588004433>",
             },
         }
+        self.badge_index = NameIndex(self.badges.values(), names=self.badges.keys())
 
     @commands.group(
         name="ownercmds",
@@ -267,16 +268,10 @@ class Developers(commands.Cog):
     async def badge_add(
         self, ctx: commands.Context, user: discord.User, *, badge_name: str
     ):
-        badge_names = list(self.badges.keys())
-        result = process.extractOne(
-            badge_name,
-            badge_names,
-            scorer=fuzz.ratio,
-            score_cutoff=60,
-        )
+        badge = self.badge_index.find(badge_name, threshold=60, scorer="ratio")
 
-        if not result:
-            available_badges = "\n".join([f"• `{name}`" for name in badge_names])
+        if not badge:
+            available_badges = "\n".join([f"• `{name}`" for name in self.badges])
             return await ctx.send(
                 embed=Embeds.embed(
                     author=ctx.author,
@@ -285,10 +280,6 @@ class Developers(commands.Cog):
                 )
             )
 
-        matched_badge_name = result[0]
-        matched_score = result[1]
-        badge = self.badges[matched_badge_name]
-
         user_data = await self.dbf.get_user_data(user_id=user.id)
         badges_list = user_data.get("Badges", [])
 
@@ -331,13 +322,11 @@ class Developers(commands.Cog):
                 )
             )
 
-        user_badge_names = [b.get("name", "") for b in badges_list]
+        removed_badge = NameIndex(
+            badges_list, names=[b.get("name", "") for b in badges_list]
+        ).find(badge_name, threshold=60, scorer="ratio")
 
-        result = process.extractOne(
-            badge_name, user_badge_names, scorer=fuzz.ratio, score_cutoff=60
-        )
-
-        if not result:
+        if not removed_badge:
             current_badges = "\n".join(
                 [
                     f"• {b.get('emoji', '')} `{b.get('name', 'Unknown')}`"
@@ -351,17 +340,9 @@ class Developers(commands.Cog):
                 )
             )
 
-        matched_badge_name = result[0]
-        matched_score = result[1]
-
-        removed_badge = None
+        matched_badge_name = removed_badge.get("name", "")
         badges_list = [b for b in badges_list if b.get("name") != matched_badge_name]
 
-        for b in user_data.get("Badges", []):
-            if b.get("name") == matched_badge_name:
-                removed_badge = b
-                break
-
         user_data["Badges"] = badges_list
         await self.dbf.set_user_data(user_id=user.id, data=user_data)
 
@@ -372,66 +353,149 @@ class Developers(commands.Cog):
             )
         )
 
-    @ownercmds_group.command(name="reload", help="Reload all commands and events")
+    @ownercmds_group.command(
+        name="vacuum", help="Delete empty guild, member and user rows"
+    )
     @checks.is_owner()
-    async def reload(self, ctx: commands.Context):
+    async def vacuum_command(self, ctx: commands.Context):
         msg = await ctx.send(
             embed=Embeds.loading(
+                author=ctx.author, description="Deleting **empty rows**..."
+            )
+        )
+
+        counts = await self.dbf.vacuum_empty_rows()
+        await self.bot.cache.guilds.clear()
+        await self.bot.cache.members.clear()
+        await self.bot.cache.users.clear()
+
+        cog_log.info(f"Vacuumed empty rows: {counts}")
+
+        await msg.edit(
+            embed=Embeds.checkmark(
                 author=ctx.author,
-                description="Reloading **all commands and events**...",
+                description=f" {self.bot.bp} ".join(
+                    f"**{count}** from `{table}`" for table, count in counts.items()
+                )
+                + " deleted.",
             )
         )
 
-        loaded = []
-        reloaded = []
-        failed = []
-        final_msg = []
+    @ownercmds_group.command(
+        name="timings", help="View event handler timings", usage="[reset] | reset"
+    )
+    @checks.is_owner()
+    async def timings_command(self, ctx: commands.Context, action: str = None):
+        if action and action.lower() == "reset":
+            self.bot.timings.reset()
+            return await ctx.send(
+                embed=Embeds.checkmark(
+                    author=ctx.author, description="Reset the **handler timings**."
+                )
+            )
 
-        cog_modules = []
-        for root, _, files in os.walk("cogs"):
-            for file in files:
-                if file.endswith(".py") and not file.startswith("__"):
-                    rel_path = os.path.relpath(os.path.join(root, file), ".")
-                    module = rel_path.replace(os.sep, ".")[:-3]
-                    cog_modules.append(module)
-
-        loaded_extensions = list(self.bot.extensions.keys())
-
-        print()
-        for module in loaded_extensions:
-            try:
-                await self.bot.reload_extension(module)
-                reloaded.append(module)
-                cog_log.info(f"Reloaded {module}")
-            except Exception as err:
-                failed.append(f"{module}: {err}")
-                cog_log.error(f"Failed to reload {module}: {err}")
-
-        for module in cog_modules:
-            if module not in loaded_extensions:
-                try:
-                    await self.bot.load_extension(module)
-                    loaded.append(module)
-                    cog_log.info(f"Loaded new cog {module}")
-                except Exception as err:
-                    failed.append(f"{module}: {err}")
-                    cog_log.error(f"Failed to load {module}: {err}")
-
-        if loaded:
-            final_msg.append(f"Loaded {len(loaded)} new files")
-        if reloaded:
-            final_msg.append(f"Reloaded {len(reloaded)} files")
-        if failed:
-            final_msg.append(f"Failed to load {len(failed)} files")
+        items = [
+            f"`{name}` {calls} calls {self.bot.bp} avg **{mean * 1000:.2f}ms** {self.bot.bp} max **{peak * 1000:.2f}ms**"
+            for name, calls, mean, peak, total in self.bot.timings.snapshot()
+        ]
+
+        paginator = views.Paginator(
+            bot=self.bot,
+            ctx=ctx,
+            items=items,
+            items_per_page=10,
+            embed_title="Handler timings",
+            embed_description="Nothing has been timed yet.",
+            owner=ctx.author,
+            owner_can_delete=True,
+        )
+        await paginator.start()
 
-        print()
+    @ownercmds_group.command(
+        name="cookies",
+        help="View the Roblox cookie pool",
+        usage="[reload] | reload",
+    )
+    @checks.is_owner()
+    async def cookies_command(self, ctx: commands.Context, action: str = None):
+        service = self.bot.roblox
 
-        await asyncio.sleep(1)
+        if (action and action.lower() == "reload") or not service.loaded:
+            await service.reload()
 
-        await msg.edit(
-            embed=Embeds.checkmark(
-                author=ctx.author, description=f"{f" {self.bot.bp} ".join(final_msg)}."
+        items = []
+        for row in service.pool.snapshot():
+            fingerprint, in_flight, requests, errors, error_rate, cooldown, error = row
+
+            item = (
+                f"`{fingerprint}` {in_flight} active {self.bot.bp} {requests} requests "
+                f"{self.bot.bp} {errors} errors (**{error_rate:.0%}**)"
             )
+            if cooldown:
+                item += f" {self.bot.bp} cooling **{cooldown:.0f}s**"
+            if error:
+                item += f" {self.bot.bp} last `{error}`"
+            items.append(item)
+
+        paginator = views.Paginator(
+            bot=self.bot,
+            ctx=ctx,
+            items=items,
+            items_per_page=10,
+            embed_title="Roblox cookie pool",
+            embed_description="There aren't any cookies.",
+            owner=ctx.author,
+            owner_can_delete=True,
+        )
+        await paginator.start()
+
+    @ownercmds_group.command(
+        name="reload",
+        help="Reload changed commands, events and utils",
+        usage="[all] | all",
+    )
+    @checks.is_owner()
+    async def reload(self, ctx: commands.Context, scope: str = None):
+        force = bool(scope and scope.lower() == "all")
+        msg = await ctx.send(
+            embed=Embeds.loading(
+                author=ctx.author,
+                description=(
+                    "Reloading **all commands and events**..."
+                    if force
+                    else "Reloading **changed files**..."
+                ),
+            )
+        )
+
+        start = time.perf_counter()
+        result = await self.bot.reloader.reload(force=force)
+        elapsed = time.perf_counter() - start
+
+        final_msg = []
+        if result.loaded:
+            final_msg.append(f"Loaded {len(result.loaded)} new files")
+        reloaded = len(result.timings) - len(result.loaded)
+        if reloaded:
+            final_msg.append(f"Reloaded {reloaded} files")
+        if result.unloaded:
+            final_msg.append(f"Unloaded {len(result.unloaded)} files")
+        if result.failed:
+            final_msg.append(f"Failed to load {len(result.failed)} files")
+        if not final_msg:
+            final_msg.append("Nothing changed")
+
+        lines = [f"{f" {self.bot.bp} ".join(final_msg)} in **{elapsed * 1000:.0f}ms**."]
+        slowest = sorted(result.timings.items(), key=lambda i: i[1], reverse=True)
+        lines += [f"{self.bot.bp} `{m}` {t * 1000:.0f}ms" for m, t in slowest[:10]]
+        lines += [f"{self.bot.bp} `{m}` failed: {e}" for m, e in result.failed.items()]
+        if result.restart:
+            lines.append(
+                "Restart to apply: " + ", ".join(f"`{m}`" for m in result.restart)
+            )
+
+        await msg.edit(
+            embed=Embeds.checkmark(author=ctx.author, description="\n".join(lines))
         )
 
 
@@ -1,18 +1,31 @@
-import discord, logging
+import discord, logging, re
 from discord.ext import commands
 from discord.utils import utcnow
 
+from collections import Counter
 from datetime import timedelta, datetime
-from typing import Optional, Union, List
+from typing import Optional, Union, List, Tuple
 
 from utils import exceptions, permissions, helpers, views, checks
 from utils.messages import Embeds
-from utils.converters import PartialRole
+from utils.converters import parse_roles
+from utils.workers import run_bounded
+from utils.purge import purge_channel
 
 from main import Bot
 
 log = logging.getLogger("Main")
 
+MASS_TARGET_LIMIT = 1000
+MASS_TARGET_FILE_MAX_BYTES = 1024 * 1024
+MASS_CONCURRENCY = 5
+BULK_BAN_SIZE = 200
+PURGE_SCAN_LIMIT = 5000
+MAX_TIMEOUT_SECONDS = 28 * 24 * 60 * 60 - 60
+
+TARGET_ARG_RE = re.compile(r"^(?:<@!?)?(\d{17,20})>?,?$")
+TARGET_FILE_RE = re.compile(r"\b\d{17,20}\b")
+
 
 class Mod(commands.Cog):
     def __init__(self, bot: Bot):
@@ -37,6 +50,158 @@ class Mod(commands.Cog):
                 )
             )
 
+    async def collect_mass_targets(
+        self, ctx: commands.Context, args: Tuple[str, ...]
+    ) -> Tuple[List[int], List[str]]:
+        ids: List[int] = []
+        rest: List[str] = []
+
+        for arg in args:
+            match = TARGET_ARG_RE.match(arg)
+            if match:
+                ids.append(int(match.group(1)))
+            else:
+                rest.append(arg)
+
+        for attachment in ctx.message.attachments:
+            if not attachment.filename.lower().endswith(".txt"):
+                continue
+            # A thousand IDs fit in ~20 KiB; anything near this is not a list.
+            if attachment.size > MASS_TARGET_FILE_MAX_BYTES:
+                raise exceptions.RaiseWithEmbed(
+                    embed=Embeds.warning(
+                        author=ctx.author,
+                        description=f"**{attachment.filename}** is too large, target files can be up to **1 MB**.",
+                    )
+                )
+            text = (await attachment.read()).decode("utf-8", errors="ignore")
+            ids.extend(int(found) for found in TARGET_FILE_RE.findall(text))
+
+        return list(dict.fromkeys(ids)), rest
+
+    async def resolve_mass_targets(
+        self,
+        ctx: commands.Context,
+        ids: List[int],
+        members_only: bool = False,
+        check_whitelist: bool = False,
+        skip_banned: bool = False,
+    ) -> Tuple[List[discord.abc.Snowflake], Counter]:
+        skipped = Counter()
+        targets = []
+
+        for user_id in ids:
+            member = ctx.guild.get_member(user_id)
+            if member is None and members_only:
+                skipped["not in the server"] += 1
+                continue
+            targets.append(member or discord.Object(id=user_id))
+
+        bans = await self.bot.bans.load(ctx.guild) if skip_banned else None
+
+        blocked = set()
+        if check_whitelist:
+            guild_data = await self.dbf.get_guild_data(guild_id=ctx.guild.id)
+            blocked = set(
+                guild_data.get("Configuration", {})
+                .get("Ban", {})
+                .get("Blocked_Users", [])
+            )
+
+        allowed = []
+        verdicts = permissions.member_verdicts(ctx.author, targets)
+        for target, verdict in zip(targets, verdicts):
+            if verdict:
+                skipped["hierarchy"] += 1
+            elif str(target.id) in blocked:
+                skipped["whitelisted"] += 1
+            elif bans is not None and target.id in bans:
+                skipped["already banned"] += 1
+            else:
+                allowed.append(target)
+
+        return allowed, skipped
+
+    async def confirm_mass_action(
+        self, ctx: commands.Context, verb: str, count: int
+    ) -> bool:
+        view = views.ConfirmOrDecline(owner=ctx.author, timeout=60)
+        msg = await ctx.send(
+            embed=Embeds.warning(
+                author=ctx.author,
+                description=f"Are you sure you want to **{verb} {count}** user(s)?",
+            ),
+            view=view,
+        )
+
+        await view.wait()
+        view.clear_items()
+        await msg.delete()
+
+        return bool(view.value)
+
+    def mass_skipped(self, skipped: Counter) -> str:
+        if not skipped:
+            return ""
+        return (
+            "Skipped "
+            + ", ".join(f"**{count}** ({why})" for why, count in skipped.items())
+            + "."
+        )
+
+    def mass_summary(self, verb: str, done: int, total: int, skipped: Counter) -> str:
+        return f"**{done}/{total}** user(s) {verb}. {self.mass_skipped(skipped)}".strip()
+
+    async def run_mass_targets(
+        self,
+        ctx: commands.Context,
+        args: Tuple[str, ...],
+        verb: str,
+        members_only: bool = False,
+        check_whitelist: bool = False,
+        skip_banned: bool = False,
+    ) -> Optional[Tuple[List[discord.abc.Snowflake], Counter, List[str]]]:
+        ids, rest = await self.collect_mass_targets(ctx, args)
+
+        if not ids:
+            await ctx.send(
+                embed=Embeds.command(
+                    command=ctx.command, author=ctx.author, prefix=ctx.prefix
+                )
+            )
+            return None
+
+        if len(ids) > MASS_TARGET_LIMIT:
+            await ctx.send(
+                embed=Embeds.warning(
+                    author=ctx.author,
+                    description=f"You can only {verb} up to **{MASS_TARGET_LIMIT}** users at once.",
+                )
+            )
+            return None
+
+        targets, skipped = await self.resolve_mass_targets(
+            ctx,
+            ids,
+            members_only=members_only,
+            check_whitelist=check_whitelist,
+            skip_banned=skip_banned,
+        )
+
+        if not targets:
+            await ctx.send(
+                embed=Embeds.warning(
+                    author=ctx.author,
+                    description=f"I couldn't **{verb}** any of those users. {self.mass_skipped(skipped)}".strip(),
+                )
+            )
+            return None
+
+        if not await self.confirm_mass_action(ctx, verb, len(targets)):
+            return None
+
+        return targets, skipped, rest
+
     @commands.group(
         name="ban",
         help="Ban someone from the server",
@@ -99,7 +264,7 @@ class Mod(commands.Cog):
                     if not view.value:
                         return
 
-            if await helpers.promise_ban_entry(guild=ctx.guild, user=user):
+            if await self.bot.bans.is_banned(ctx.guild, user):
                 return await ctx.send(
                     embed=Embeds.warning(
                         author=ctx.author,
@@ -147,7 +312,40 @@ class Mod(commands.Cog):
     @commands.has_permissions(ban_members=True)
     @commands.bot_has_permissions(ban_members=True)
     async def list_ban_command(self, ctx: commands.Context):
-        return
+        entries = await self.bot.bans.entries(ctx.guild)
+
+        if entries is None:
+            return await ctx.send(
+                embed=Embeds.issue(
+                    author=ctx.author,
+                    description="I **couldn't load the bans**. Try again later.",
+                )
+            )
+
+        if not entries:
+            return await ctx.send(
+                embed=Embeds.warning(
+                    author=ctx.author,
+                    description=f"There **aren't any bans** in **{ctx.guild.name}**.",
+                )
+            )
+
+        items = [
+            f"`{index+1}` **{entry.user.name}** (`{entry.user.id}`)"
+            + (f" {self.bot.bp} {entry.reason}" if entry.reason else "")
+            for index, entry in enumerate(entries)
+        ]
+
+        paginator = views.Paginator(
+            bot=self.bot,
+            ctx=ctx,
+            items=items,
+            items_per_page=10,
+            embed_title=f"Bans in {ctx.guild.name}",
+            owner=ctx.author,
+            owner_can_delete=True,
+        )
+        await paginator.start()
 
     @commands.command(
         name="hardban",
@@ -217,7 +415,7 @@ class Mod(commands.Cog):
             except exceptions.RaiseWithEmbed as err:
                 return await ctx.send(embed=err.embed)
 
-            if not await helpers.promise_ban_entry(guild=ctx.guild, user=user):
+            if not await self.bot.bans.is_banned(ctx.guild, user):
                 await ctx.guild.ban(
                     user=user,
                     reason=f"Issued by {ctx.author.name} / {reason}",
@@ -303,7 +501,7 @@ class Mod(commands.Cog):
                     if not view.value:
                         return
 
-            if await helpers.promise_ban_entry(guild=ctx.guild, user=user):
+            if await self.bot.bans.is_banned(ctx.guild, user):
                 return await ctx.send(
                     embed=Embeds.warning(
                         author=ctx.author,
@@ -393,7 +591,7 @@ class Mod(commands.Cog):
                 if not view.value:
                     return
 
-            if not await helpers.promise_ban_entry(guild=ctx.guild, user=user):
+            if not await self.bot.bans.is_banned(ctx.guild, user):
                 return await ctx.send(
                     embed=Embeds.embed(
                         author=ctx.author,
@@ -533,7 +731,6 @@ class Mod(commands.Cog):
 
         reason = " ".join(raw_reason) if raw_reason else "No reason provided."
 
-        MAX_TIMEOUT_SECONDS = 28 * 24 * 60 * 60 - 60
         if timeout_seconds > MAX_TIMEOUT_SECONDS:
             timeout_seconds = MAX_TIMEOUT_SECONDS
             raw_duration = "28d"
@@ -621,6 +818,228 @@ class Mod(commands.Cog):
             )
         )
 
+    @commands.command(
+        name="massban",
+        help="Ban a list of user IDs, or the IDs in an attached .txt file",
+        usage="(user ids) [history] [reason] | 1234 5678 1d Raid",
+    )
+    @commands.guild_only()
+    @checks.is_antinuke_admin()
+    @commands.has_permissions(ban_members=True)
+    @commands.bot_has_permissions(ban_members=True)
+    @commands.cooldown(rate=1, per=30, type=commands.BucketType.guild)
+    async def massban_command(self, ctx: commands.Context, *args: str):
+        resolved = await self.run_mass_targets(
+            ctx, args, verb="ban", check_whitelist=True, skip_banned=True
+        )
+        if resolved is None:
+            return
+        targets, skipped, rest = resolved
+
+        delete_message_seconds = 86400
+        raw_reason = []
+        for arg in rest:
+            try:
+                delete_message_seconds = helpers.parse_duration(
+                    value=arg, default_unit="s", max_time="7d"
+                )
+                continue
+            except exceptions.MaxDurationExceeded:
+                delete_message_seconds = 604800
+                continue
+            except ValueError:
+                pass
+            raw_reason.append(arg)
+        reason = " ".join(raw_reason) if raw_reason else "No reason provided."
+        audit_reason = f"Issued by {ctx.author.name} / {reason}"
+
+        total = len(targets)
+        msg = await ctx.send(
+            embed=Embeds.loading(
+                author=ctx.author, description=f"Banning **0/{total}** user(s)..."
+            )
+        )
+
+        for target in targets:
+            if isinstance(target, discord.Member):
+                await self.role_cache_entry(self, guild=ctx.guild, member=target)
+
+        async def ban_one(user: discord.abc.Snowflake):
+            await ctx.guild.ban(
+                user, reason=audit_reason, delete_message_seconds=delete_message_seconds
+            )
+
+        banned = 0
+        try:
+            for start in range(0, total, BULK_BAN_SIZE):
+                chunk = targets[start : start + BULK_BAN_SIZE]
+                try:
+                    result = await ctx.guild.bulk_ban(
+                        chunk,
+                        reason=audit_reason,
+                        delete_message_seconds=delete_message_seconds,
+                    )
+                    banned += len(result.banned)
+                except discord.Forbidden:
+                    raise
+                except discord.HTTPException:
+                    # Bulk bans fail as a whole when nothing could be banned;
+                    # retry the chunk one by one so partial progress still lands.
+                    results = await run_bounded(chunk, ban_one, limit=MASS_CONCURRENCY)
+                    banned += sum(1 for r in results if not isinstance(r, Exception))
+
+                await msg.edit(
+                    embed=Embeds.loading(
+                        author=ctx.author,
+                        description=f"Banning **{start + len(chunk)}/{total}** user(s)...",
+                    )
+                )
+        except discord.Forbidden:
+            return await msg.edit(
+                embed=Embeds.warning(
+                    author=ctx.author,
+                    description="I'm **missing** permissions to ban these users.",
+                )
+            )
+
+        await msg.edit(
+            embed=Embeds.checkmark(
+                author=ctx.author,
+                description=self.mass_summary("banned", banned, total, skipped),
+            )
+        )
+
+    @commands.command(
+        name="masskick",
+        help="Kick a list of member IDs, or the IDs in an attached .txt file",
+        usage="(member ids) [reason] | 1234 5678 Raid",
+    )
+    @commands.guild_only()
+    @checks.is_antinuke_admin()
+    @commands.has_permissions(kick_members=True)
+    @commands.bot_has_permissions(kick_members=True)
+    @commands.cooldown(rate=1, per=30, type=commands.BucketType.guild)
+    async def masskick_command(self, ctx: commands.Context, *args: str):
+        resolved = await self.run_mass_targets(
+            ctx, args, verb="kick", members_only=True
+        )
+        if resolved is None:
+            return
+        targets, skipped, rest = resolved
+
+        reason = " ".join(rest) if rest else "No reason provided."
+        audit_reason = f"Issued by {ctx.author.name} / {reason}"
+
+        total = len(targets)
+        msg = await ctx.send(
+            embed=Embeds.loading(
+                author=ctx.author, description=f"Kicking **0/{total}** member(s)..."
+            )
+        )
+
+        async def kick_one(member: discord.Member):
+            await self.role_cache_entry(self, guild=ctx.guild, member=member)
+            await member.kick(reason=audit_reason)
+
+        async def progress(done: int):
+            await msg.edit(
+                embed=Embeds.loading(
+                    author=ctx.author,
+                    description=f"Kicking **{done}/{total}** member(s)...",
+                )
+            )
+
+        results = await run_bounded(
+            targets, kick_one, limit=MASS_CONCURRENCY, on_progress=progress
+        )
+        kicked = sum(1 for r in results if not isinstance(r, Exception))
+
+        await msg.edit(
+            embed=Embeds.checkmark(
+                author=ctx.author,
+                description=self.mass_summary("kicked", kicked, total, skipped),
+            )
+        )
+
+    @commands.command(
+        name="masstimeout",
+        help="Timeout a list of member IDs, or the IDs in an attached .txt file",
+        usage="(member ids) [duration] [reason] | 1234 5678 1h Raid",
+        aliases=["massto"],
+    )
+    @commands.guild_only()
+    @checks.is_antinuke_admin()
+    @commands.has_permissions(moderate_members=True)
+    @commands.bot_has_permissions(moderate_members=True)
+    @commands.cooldown(rate=1, per=30, type=commands.BucketType.guild)
+    async def masstimeout_command(self, ctx: commands.Context, *args: str):
+        resolved = await self.run_mass_targets(
+            ctx, args, verb="timeout", members_only=True
+        )
+        if resolved is None:
+            return
+        targets, skipped, rest = resolved
+
+        timeout_seconds = None
+        raw_duration = "5m"
+        raw_reason = []
+        for arg in rest:
+            if timeout_seconds is None:
+                try:
+                    timeout_seconds = helpers.parse_duration(
+                        value=arg, default_unit="s", max_time=None
+                    )
+                    raw_duration = arg
+                    continue
+                except ValueError:
+                    pass
+            raw_reason.append(arg)
+
+        if timeout_seconds is None:
+            timeout_seconds = helpers.parse_duration(
+                value="5m", default_unit="s", max_time=None
+            )
+        if timeout_seconds > MAX_TIMEOUT_SECONDS:
+            timeout_seconds = MAX_TIMEOUT_SECONDS
+            raw_duration = "28d"
+
+        reason = " ".join(raw_reason) if raw_reason else "No reason provided."
+        audit_reason = f"Issued by {ctx.author.name} / {reason}"
+        duration = timedelta(seconds=timeout_seconds)
+
+        total = len(targets)
+        msg = await ctx.send(
+            embed=Embeds.loading(
+                author=ctx.author,
+                description=f"Timing out **0/{total}** member(s)...",
+            )
+        )
+
+        async def timeout_one(member: discord.Member):
+            await member.timeout(duration, reason=audit_reason)
+
+        async def progress(done: int):
+            await msg.edit(
+                embed=Embeds.loading(
+                    author=ctx.author,
+                    description=f"Timing out **{done}/{total}** member(s)...",
+                )
+            )
+
+        results = await run_bounded(
+            targets, timeout_one, limit=MASS_CONCURRENCY, on_progress=progress
+        )
+        timed_out = sum(1 for r in results if not isinstance(r, Exception))
+
+        await msg.edit(
+            embed=Embeds.checkmark(
+                author=ctx.author,
+                description=self.mass_summary(
+                    f"timed out for **{raw_duration}**", timed_out, total, skipped
+                ),
+            )
+        )
+
     @commands.command(
         name="purge",
         help="Delete a large amount of messages",
@@ -685,11 +1104,12 @@ class Mod(commands.Cog):
 
         try:
             await ctx.message.delete()
-            await ctx.channel.purge(
-                limit=amount,
+            result = await purge_channel(
+                ctx.channel,
+                amount=amount,
                 check=check,
+                scan_limit=PURGE_SCAN_LIMIT,
                 reason=f"Purged by {ctx.author.name} / {reason}",
-                bulk=True,
             )
         except discord.Forbidden:
             return await ctx.send(
@@ -699,14 +1119,32 @@ class Mod(commands.Cog):
                 )
             )
         except discord.HTTPException:
+            return await ctx.send(
+                embed=Embeds.issue(
+                    author=ctx.author,
+                    description="I **couldn't purge messages**. Try again later.",
+                )
+            )
+
+        if not result.deleted:
             return await ctx.send(
                 embed=Embeds.embed(
                     author=ctx.author,
-                    description=f"I couldn't find any messages (try a bigger search).",
+                    description=f"I couldn't find any messages to delete in the last **{result.scanned}** messages.",
                     emoji=":mag:",
                 )
             )
 
+        description = f"Deleted **{result.deleted}** message(s) after scanning **{result.scanned}**."
+        if result.stopped_by == "age":
+            description += " Older messages can't be bulk deleted."
+        elif result.stopped_by == "budget" and result.deleted < amount:
+            description += " Stopped at the scan limit."
+
+        await ctx.send(
+            embed=Embeds.checkmark(author=ctx.author, description=description)
+        )
+
     @commands.command(
         name="nuke",
         help="Nuke a channel",
@@ -930,31 +1368,18 @@ class Mod(commands.Cog):
         remove: List[discord.Role] = []
         skipped: List[str] = []
 
-        roles_list = list(args)
-        i = 0
-
-        while i < len(roles_list):
-            matched_role: Optional[discord.Role] = None
-            matched_span = 0
-
-            for j in range(len(roles_list), i, -1):
-                phrase = " ".join(roles_list[i:j]).strip()
-                if not phrase:
-                    continue
-                try:
-                    matched_role = await PartialRole().convert(ctx, phrase)
-                    matched_span = j - i
-                    break
-                except commands.BadArgument:
-                    continue
+        bot_top = ctx.guild.me.top_role
+        author_top = ctx.author.top_role
+        seen = set()
 
+        for matched_role, phrase in parse_roles(ctx.guild, args):
             if matched_role is None:
-                skipped.append(roles_list[i])
-                i += 1
+                skipped.append(phrase)
                 continue
 
-            bot_top = ctx.guild.me.top_role
-            author_top = ctx.author.top_role
+            if matched_role.id in seen:
+                continue
+            seen.add(matched_role.id)
 
             if matched_role.position >= bot_top.position:
                 skipped.append(matched_role.name)
@@ -969,8 +1394,6 @@ class Mod(commands.Cog):
                 else:
                     add.append(matched_role)
 
-            i += matched_span
-
         if not add and not remove:
             if skipped:
                 description = "Skipped: " + ", ".join(skipped)
@@ -982,14 +1405,9 @@ class Mod(commands.Cog):
             )
 
         try:
-            if remove:
-                await member.remove_roles(
-                    *remove, reason=f"Issued by {ctx.author}", atomic=False
-                )
-            if add:
-                await member.add_roles(
-                    *add, reason=f"Issued by {ctx.author}", atomic=False
-                )
+            await self.bot.role_edits.edit(
+                member, add=add, remove=remove, reason=f"Issued by {ctx.author}"
+            )
 
             await self.role_cache_entry(self, guild=ctx.guild, member=member)
         except discord.Forbidden:
@@ -1259,31 +1677,18 @@ class Mod(commands.Cog):
         remove: List[discord.Role] = []
         skipped: List[str] = []
 
-        roles_list = list(args)
-        i = 0
-
-        while i < len(roles_list):
-            matched_role: Optional[discord.Role] = None
-            matched_span = 0
-
-            for j in range(len(roles_list), i, -1):
-                phrase = " ".join(roles_list[i:j]).strip()
-                if not phrase:
-                    continue
-                try:
-                    matched_role = await PartialRole().convert(ctx, phrase)
-                    matched_span = j - i
-                    break
-                except commands.BadArgument:
-                    continue
+        bot_top = ctx.guild.me.top_role
+        author_top = ctx.author.top_role
+        seen = set()
 
+        for matched_role, phrase in parse_roles(ctx.guild, args):
             if matched_role is None:
-                skipped.append(roles_list[i])
-                i += 1
+                skipped.append(phrase)
                 continue
 
-            bot_top = ctx.guild.me.top_role
-            author_top = ctx.author.top_role
+            if matched_role.id in seen:
+                continue
+            seen.add(matched_role.id)
 
             if matched_role.position >= bot_top.position:
                 skipped.append(matched_role.name)
@@ -1298,8 +1703,6 @@ class Mod(commands.Cog):
                 else:
                     add.append(matched_role)
 
-            i += matched_span
-
         if not add and not remove:
             if skipped:
                 description = "Skipped: " + ", ".join(skipped)
@@ -1311,14 +1714,9 @@ class Mod(commands.Cog):
             )
 
         try:
-            if add:
-                await member.add_roles(
-                    *add, reason=f"Issued by {ctx.author}", atomic=False
-                )
-            if remove:
-                await member.remove_roles(
-                    *remove, reason=f"Issued by {ctx.author}", atomic=False
-                )
+            await self.bot.role_edits.edit(
+                member, add=add, remove=remove, reason=f"Issued by {ctx.author}"
+            )
 
             member_data = await self.dbf.get_member_data(
                 guild_id=ctx.guild.id, member_id=member.id
@@ -1385,9 +1783,7 @@ class Mod(commands.Cog):
     ):
         guild = ctx.guild
         author = ctx.author
-        cache_key = f"{guild.id}:{member.id}"
-
-        cached_role_ids = await self.bot.cache.roles.get(cache_key)
+        cached_role_ids = await self.bot.role_snapshots.get(guild.id, member.id)
 
         if not cached_role_ids:
             return await ctx.send(
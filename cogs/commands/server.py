@@ -1,7 +1,7 @@
-import discord
+import discord, re, logging
 from discord.ext import commands
 
-from typing import Optional, Union
+from typing import Optional, Union, Dict, List, Set
 from datetime import datetime
 
 from utils import views, helpers
@@ -9,6 +9,18 @@ from utils.messages import Embeds
 
 from main import Bot
 
+log = logging.getLogger("Main")
+
+CUSTOM_EMOJI_RE = re.compile(r"^<a?:\w+:(\d+)>$")
+
+
+def reaction_emoji_key(emoji: Union[str, discord.PartialEmoji]) -> str:
+    if isinstance(emoji, discord.PartialEmoji):
+        return str(emoji.id) if emoji.id else emoji.name
+
+    match = CUSTOM_EMOJI_RE.match(emoji)
+    return match.group(1) if match else emoji
+
 
 class Server(commands.Cog):
     def __init__(self, bot: Bot):
@@ -17,6 +29,46 @@ class Server(commands.Cog):
         self.snipes = bot.cache.snipes
         self.img_extensions = (".png", ".jpg", ".jpeg", ".gif", ".webp")
 
+        # message_id -> emoji key -> role ids, plus guild_id -> message ids
+        self.reaction_roles: Dict[int, Dict[str, List[int]]] = {}
+        self.reaction_role_messages: Dict[int, Set[int]] = {}
+
+    async def cog_load(self):
+        try:
+            all_reaction_roles = await self.dbf.get_reaction_roles()
+            for guild_id, reaction_roles_data in all_reaction_roles.items():
+                self.index_reaction_roles(guild_id, reaction_roles_data)
+        except Exception as e:
+            log.error(f"Error building reaction role index: {e}")
+
+        self.dbf.add_invalidation_hook("guilds", self.on_guild_data_invalidate)
+
+    async def cog_unload(self):
+        self.dbf.remove_invalidation_hook("guilds", self.on_guild_data_invalidate)
+
+    def index_reaction_roles(self, guild_id: int, reaction_roles_data: dict):
+        for message_id in self.reaction_role_messages.pop(guild_id, set()):
+            self.reaction_roles.pop(message_id, None)
+
+        message_ids = set()
+        for message_id, message_reactions in reaction_roles_data.items():
+            emojis = {
+                reaction_emoji_key(emoji): [int(rid) for rid in data["role_ids"]]
+                for emoji, data in message_reactions.items()
+            }
+            if emojis:
+                self.reaction_roles[int(message_id)] = emojis
+                message_ids.add(int(message_id))
+
+        if message_ids:
+            self.reaction_role_messages[guild_id] = message_ids
+
+    async def on_guild_data_invalidate(self, data: dict):
+        guild_id = int(data["id"])
+        guild_data = await self.dbf.get_guild_data(guild_id=guild_id)
+        guild_config = guild_data.get("Configuration", {})
+        self.index_reaction_roles(guild_id, guild_config.get("Reaction_Roles", {}))
+
     @staticmethod
     def parse_keyword_list(text: str) -> list[str]:
         parts = [p.strip() for p in text.split(",")]
@@ -840,6 +892,7 @@ class Server(commands.Cog):
         }
 
         await self.dbf.set_guild_data(guild_id=ctx.guild.id, data=guild_data)
+        self.index_reaction_roles(ctx.guild.id, reaction_roles_data)
 
         role_mentions = ", ".join([r.mention for r in roles])
         await ctx.send(
@@ -913,6 +966,7 @@ class Server(commands.Cog):
             reaction_roles_data.pop(str(target_msg_id))
 
         await self.dbf.set_guild_data(guild_id=ctx.guild.id, data=guild_data)
+        self.index_reaction_roles(ctx.guild.id, reaction_roles_data)
 
         await ctx.send(
             embed=Embeds.checkmark(
@@ -923,58 +977,65 @@ class Server(commands.Cog):
 
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
-        if payload.user_id == self.bot.user.id or payload.guild_id is None:
+        message_reactions = self.reaction_roles.get(payload.message_id)
+        if message_reactions is None:
             return
 
-        guild_data = await self.dbf.get_guild_data(guild_id=payload.guild_id)
-        guild_config = guild_data.get("Configuration", {})
-        reaction_roles_data = guild_config.get("Reaction_Roles", {})
+        if payload.user_id == self.bot.user.id or payload.guild_id is None:
+            return
 
-        message_reactions = reaction_roles_data.get(str(payload.message_id), {})
-        emoji_str = str(payload.emoji)
+        role_ids = message_reactions.get(reaction_emoji_key(payload.emoji))
+        if not role_ids:
+            return
 
-        if emoji_str in message_reactions:
-            guild = self.bot.get_guild(payload.guild_id)
-            member = guild.get_member(payload.user_id)
+        guild = self.bot.get_guild(payload.guild_id)
+        member = payload.member or (guild and guild.get_member(payload.user_id))
+        if not member:
+            return
 
-            role_ids = message_reactions[emoji_str]["role_ids"]
+        roles = [guild.get_role(role_id) for role_id in role_ids]
+        roles = [role for role in roles if role]
+        if not roles:
+            return
 
-            for role_id in role_ids:
-                role = guild.get_role(role_id)
-                if role and role not in member.roles:
-                    try:
-                        await member.add_roles(
-                            role, reason=f"Reaction role ({payload.message_id})"
-                        )
-                    except discord.Forbidden:
-                        pass
+        try:
+            await self.bot.role_edits.edit(
+                member, add=roles, reason=f"Reaction role ({payload.message_id})"
+            )
+        except (discord.Forbidden, discord.HTTPException):
+            pass
 
     @commands.Cog.listener()
     async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
+        message_reactions = self.reaction_roles.get(payload.message_id)
+        if message_reactions is None:
+            return
+
         if payload.user_id == self.bot.user.id or not payload.guild_id:
             return
 
-        guild_data = await self.dbf.get_guild_data(guild_id=payload.guild_id)
-        guild_config = guild_data.get("Configuration", {})
-        reaction_roles_data = guild_config.get("Reaction_Roles", {})
-
-        message_reactions = reaction_roles_data.get(str(payload.message_id), {})
-        emoji_str = str(payload.emoji)
-
-        if emoji_str in message_reactions:
-            guild = self.bot.get_guild(payload.guild_id)
-            member = guild.get_member(payload.user_id)
-
-            role_ids = message_reactions[emoji_str]["role_ids"]
-            for role_id in role_ids:
-                role = guild.get_role(role_id)
-                if role and role in member.roles:
-                    try:
-                        await member.remove_roles(
-                            role, reason=f"Reaction role removed ({payload.message_id})"
-                        )
-                    except discord.Forbidden:
-                        pass
+        role_ids = message_reactions.get(reaction_emoji_key(payload.emoji))
+        if not role_ids:
+            return
+
+        guild = self.bot.get_guild(payload.guild_id)
+        member = guild and guild.get_member(payload.user_id)
+        if not member:
+            return
+
+        roles = [guild.get_role(role_id) for role_id in role_ids]
+        roles = [role for role in roles if role]
+        if not roles:
+            return
+
+        try:
+            await self.bot.role_edits.edit(
+                member,
+                remove=roles,
+                reason=f"Reaction role removed ({payload.message_id})",
+            )
+        except (discord.Forbidden, discord.HTTPException):
+            pass
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
@@ -1,4 +1,4 @@
-import discord, re, roblox, random, asyncio
+import discord, re
 from discord.ext import commands
 from discord.utils import utcnow
 
@@ -7,6 +7,8 @@ from typing import Optional, Union, List
 
 from utils import helpers, views, checks
 from utils.messages import Embeds, Emojis, Colours
+from utils.lookup import lookups
+from utils.rbx import NoCookiesAvailable
 
 from main import Bot
 
@@ -25,6 +27,8 @@ class Utility(commands.Cog):
         usage="(username) | roblox",
     )
     async def roblox_command(self, ctx: commands.Context, *, username: str = "Roblox"):
+        import roblox
+
         msg = await ctx.send(
             embed=Embeds.loading(
                 author=ctx.author,
@@ -32,65 +36,30 @@ class Utility(commands.Cog):
             )
         )
 
-        cookies = await self.dbf.get_roblox_cookies()
-        cookies = cookies["Cookies"]
-        cookie = None
-
-        if len(cookies) >= 1:
-            cookie = random.choice(cookies)
-        else:
+        try:
+            profile = await self.bot.roblox.get_profile(username)
+        except NoCookiesAvailable:
             return await ctx.send(
                 embed=Embeds.issue(
                     author=ctx.author,
                     description=f"The client to view Roblox profiles is currently down. Try again later.",
                 )
             )
-
-        client = roblox.Client(token=cookie)
-        cache = self.bot.cache.roblox
-        profile = await cache.get(username, None)
-
-        if not profile:
-            try:
-                user = await client.get_user_by_username(username=username)
-
-                profile = {
-                    "id": user.id,
-                    "name": user.name,
-                    "display_name": user.display_name,
-                    "description": user.description,
-                    "is_banned": user.is_banned,
-                    "friends_count": await user.get_friend_count(),
-                    "follower_count": await user.get_follower_count(),
-                    "following_count": await user.get_following_count(),
-                    "created_timestamp": int(user.created.timestamp()),
-                }
-
-                user_thumbnails = await client.thumbnails.get_user_avatar_thumbnails(
-                    users=[user],
-                    type=roblox.AvatarThumbnailType.full_body,
-                    size=(420, 420),
-                )
-
-                if len(user_thumbnails) > 0:
-                    profile["thumbnail"] = user_thumbnails[0].image_url
-
-                await cache.set(key=username, value=profile)
-            except roblox.TooManyRequests:
-                return await ctx.send(
-                    embed=Embeds.issue(
-                        author=ctx.author,
-                        description=f"I'm being rate-limited by Roblox. Try again later.",
-                    )
+        except roblox.TooManyRequests:
+            return await ctx.send(
+                embed=Embeds.issue(
+                    author=ctx.author,
+                    description=f"I'm being rate-limited by Roblox. Try again later.",
                 )
-            except roblox.UserNotFound:
-                return await ctx.send(
-                    embed=Embeds.embed(
-                        author=ctx.author,
-                        description=f"I couldn't find a user by (`{username}`)[https://www.roblox.com/{username}]",
-                        emoji=":mag:",
-                    )
+            )
+        except roblox.UserNotFound:
+            return await ctx.send(
+                embed=Embeds.embed(
+                    author=ctx.author,
+                    description=f"I couldn't find a user by (`{username}`)[https://www.roblox.com/{username}]",
+                    emoji=":mag:",
                 )
+            )
 
         embed = discord.Embed()
         embed.set_author(name=ctx.author.name, icon_url=ctx.author.display_avatar.url)
@@ -106,7 +75,7 @@ class Utility(commands.Cog):
 
         if profile.get("thumbnail", None):
             embed.set_thumbnail(url=profile["thumbnail"])
-            embed.colour = await helpers.image_primary_colour(url=profile["thumbnail"])
+            embed.colour = profile.get("colour")
 
         embed.add_field(
             name="Dates",
@@ -132,8 +101,6 @@ class Utility(commands.Cog):
             )
         )
 
-        await asyncio.sleep(1)
-
         await msg.edit(embed=embed, view=view)
 
     @commands.command(
@@ -192,33 +159,34 @@ class Utility(commands.Cog):
 
         normalized = query.strip(":").replace(" ", "_")
 
-        for emoji in ctx.guild.emojis:
-            if emoji.name.lower() == normalized.lower():
-                embed = discord.Embed(title=f"{emoji.name}")
-                embed.set_author(
-                    name=ctx.author.name, icon_url=ctx.author.display_avatar.url
-                )
-                embed.colour = await helpers.image_primary_colour(url=emoji.url)
-                embed.set_image(url=emoji.url)
+        emoji = lookups.emojis(ctx.guild).get(normalized)
+        if emoji:
+            embed = discord.Embed(title=f"{emoji.name}")
+            embed.set_author(
+                name=ctx.author.name, icon_url=ctx.author.display_avatar.url
+            )
+            embed.colour = await helpers.image_primary_colour(url=emoji.url)
+            embed.set_image(url=emoji.url)
 
-                view = discord.ui.View()
-                view.add_item(discord.ui.Button(label="Emoji", url=str(emoji.url)))
+            view = discord.ui.View()
+            view.add_item(discord.ui.Button(label="Emoji", url=str(emoji.url)))
 
-                return await msg.edit(embed=embed, view=view)
+            return await msg.edit(embed=embed, view=view)
 
-        for sticker in ctx.guild.stickers:
-            if sticker.name.lower() == normalized.lower():
-                embed = discord.Embed(title=f"{sticker.name}")
-                embed.set_author(
-                    name=ctx.author.name, icon_url=ctx.author.display_avatar.url
-                )
-                embed.colour = await helpers.image_primary_colour(url=url)
-                embed.set_image(url=sticker.url)
+        stickers = lookups.stickers(ctx.guild)
+        sticker = stickers.get(normalized) or stickers.get(query.strip(":"))
+        if sticker:
+            embed = discord.Embed(title=f"{sticker.name}")
+            embed.set_author(
+                name=ctx.author.name, icon_url=ctx.author.display_avatar.url
+            )
+            embed.colour = await helpers.image_primary_colour(url=sticker.url)
+            embed.set_image(url=sticker.url)
 
-                view = discord.ui.View()
-                view.add_item(discord.ui.Button(label="Sticker", url=sticker.url))
+            view = discord.ui.View()
+            view.add_item(discord.ui.Button(label="Sticker", url=sticker.url))
 
-                return await msg.edit(embed=embed, view=view)
+            return await msg.edit(embed=embed, view=view)
 
         return await msg.edit(
             embed=Embeds.embed(
@@ -1,15 +1,36 @@
-import discord
+import discord, asyncio, logging
 from discord.ext import commands
 from datetime import timedelta
-from utils import views, helpers, permissions
+from typing import Dict, Optional, Tuple
+from utils import views, permissions
 from utils.messages import Embeds
+from utils.voicemaster import VoiceMasterRegistry, RenameBudget
 from main import Bot
 
+log = logging.getLogger("Main")
+
+# Seconds an empty channel waits before deletion; it can be reused meanwhile.
+DELETE_GRACE = 10.0
+
 
 class Voicemaster(commands.Cog):
     def __init__(self, bot: Bot):
         self.bot = bot
         self.dbf = bot.dbf
+        self.registry = VoiceMasterRegistry()
+        self._save_locks: Dict[int, asyncio.Lock] = {}
+        self._swept = False
+        self._sweep_task: Optional[asyncio.Task] = None
+
+        # channel_id -> (channel, delete task) for empty channels in their grace period
+        self.pending_deletes: Dict[int, Tuple[discord.VoiceChannel, asyncio.Task]] = {}
+        self.renames = RenameBudget()
+        self.guild_create_cooldowns = commands.CooldownMapping(
+            commands.Cooldown(5, 60), lambda guild: guild.id
+        )
+        self.member_create_cooldowns = commands.CooldownMapping(
+            commands.Cooldown(2, 20), lambda member: (member.guild.id, member.id)
+        )
 
     class VoicemasterView(discord.ui.View):
         def __init__(self, cog):
@@ -24,7 +45,7 @@ class Voicemaster(commands.Cog):
         async def lock(
             self, interaction: discord.Interaction, button: discord.ui.Button
         ):
-            channel = await self.cog.owns_voicemaster(member=interaction.user)
+            channel = self.cog.owns_voicemaster(member=interaction.user)
 
             if channel is False:
                 return await interaction.response.send_message(
@@ -47,12 +68,14 @@ class Voicemaster(commands.Cog):
                 self, channel, {"connect": False}
             )
 
+            # Acknowledge first; the edit can queue behind channel rate limits.
+            await interaction.response.defer(ephemeral=True)
             await channel.edit(
                 overwrites=overwrites,
                 reason=f"Issued by {interaction.user.name} (VoiceMaster Lock)",
             )
 
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=Embeds.embed(
                     author=interaction.user,
                     description="Locked your **voice-channel**.",
@@ -69,7 +92,7 @@ class Voicemaster(commands.Cog):
         async def unlock(
             self, interaction: discord.Interaction, button: discord.ui.Button
         ):
-            channel = await self.cog.owns_voicemaster(member=interaction.user)
+            channel = self.cog.owns_voicemaster(member=interaction.user)
 
             if channel is False:
                 return await interaction.response.send_message(
@@ -92,12 +115,14 @@ class Voicemaster(commands.Cog):
                 self, channel, {"connect": None}
             )
 
+            # Acknowledge first; the edit can queue behind channel rate limits.
+            await interaction.response.defer(ephemeral=True)
             await channel.edit(
                 overwrites=overwrites,
                 reason=f"Issued by {interaction.user.name} (VoiceMaster Unlock)",
             )
 
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=Embeds.embed(
                     author=interaction.user,
                     description="Unlocked your **voice-channel**.",
@@ -109,26 +134,200 @@ class Voicemaster(commands.Cog):
     async def cog_load(self):
         self.bot.add_view(self.VoicemasterView(self))
 
-    async def owns_voicemaster(self, member: discord.Member):
-        guild = member.guild
-        if not member.voice:
-            return None
-
-        guild_data = await self.dbf.get_guild_data(guild_id=guild.id)
-        voicemaster_data = guild_data.get("VoiceMaster", {})
-        voicemaster_channels = voicemaster_data.get("Channels", {})
+        try:
+            all_voicemaster = await self.dbf.get_voicemaster_data()
+            for guild_id, voicemaster_data in all_voicemaster.items():
+                self.registry.load_guild(guild_id, voicemaster_data)
+        except Exception as e:
+            log.error(f"Error building VoiceMaster registry: {e}")
+
+        self.dbf.add_invalidation_hook("guilds", self.on_guild_data_invalidate)
+
+        # After a reload on_ready won't fire again, so sweep the channels the
+        # previous instance left in their grace period now.
+        if self.bot.is_ready():
+            self.start_sweep()
+
+    async def cog_unload(self):
+        self.dbf.remove_invalidation_hook("guilds", self.on_guild_data_invalidate)
+
+        # Channels still pending are picked up by the next instance's sweep.
+        for _, task in self.pending_deletes.values():
+            task.cancel()
+        self.pending_deletes.clear()
+
+    async def on_guild_data_invalidate(self, data: dict):
+        # Channel ownership is only written by this cog, so the registry stays
+        # authoritative for it; pick up settings changed elsewhere.
+        guild_id = int(data["id"])
+        guild_data = await self.dbf.get_guild_data(guild_id=guild_id)
+        self.registry.load_settings(guild_id, guild_data.get("VoiceMaster", {}))
+
+    async def save_channels(self, guild_id: int):
+        lock = self._save_locks.setdefault(guild_id, asyncio.Lock())
+        async with lock:
+            guild_data = await self.dbf.get_guild_data(guild_id=guild_id)
+            voicemaster_data = guild_data.setdefault("VoiceMaster", {})
+            voicemaster_data["Channels"] = self.registry.dump(
+                guild_id, voicemaster_data.get("Channels", {})
+            )
+            await self.dbf.set_guild_data(guild_id=guild_id, data=guild_data)
+
+    async def delete_if_empty(self, channel: discord.VoiceChannel) -> bool:
+        if channel.members:
+            return False
 
-        data = voicemaster_channels.get(str(member.voice.channel.id), None)
-        if not data:
+        try:
+            await channel.delete(reason="VoiceMaster: Channel empty")
+        except discord.NotFound:
+            pass
+        except discord.HTTPException:
             return False
 
-        if data.get("Owner") != str(member.id):
+        self.renames.forget(channel.id)
+        return self.registry.remove(channel.guild.id, channel.id)
+
+    def schedule_delete(self, channel: discord.VoiceChannel):
+        if channel.id in self.pending_deletes:
+            return
+        task = asyncio.create_task(self.delete_after_grace(channel))
+        self.pending_deletes[channel.id] = (channel, task)
+
+    def cancel_delete(self, channel_id: int) -> bool:
+        pending = self.pending_deletes.pop(channel_id, None)
+        if pending is None:
             return False
+        pending[1].cancel()
+        return True
+
+    async def delete_after_grace(self, channel: discord.VoiceChannel):
+        await asyncio.sleep(DELETE_GRACE)
+        self.pending_deletes.pop(channel.id, None)
+
+        channel = channel.guild.get_channel(channel.id)
+        if channel is None:
+            return
+
+        try:
+            if await self.delete_if_empty(channel):
+                await self.save_channels(channel.guild.id)
+        except Exception as e:
+            log.error(f"Error deleting VoiceMaster channel {channel.id}: {e}")
+
+    def take_pooled(
+        self, member: discord.Member
+    ) -> Tuple[Optional[discord.VoiceChannel], bool]:
+        guild_id = member.guild.id
+        reusable = None
+
+        for channel_id, (channel, _) in self.pending_deletes.items():
+            if channel.guild.id != guild_id or channel.members:
+                continue
+            if self.registry.owner(guild_id, channel_id) == member.id:
+                self.cancel_delete(channel_id)
+                return channel, False
+            if reusable is None and self.renames.allows(channel_id):
+                reusable = channel
+
+        if reusable is not None:
+            self.cancel_delete(reusable.id)
+            return reusable, True
+
+        return None, False
+
+    def creation_retry_after(self, member: discord.Member) -> Optional[float]:
+        guild_bucket = self.guild_create_cooldowns.get_bucket(member.guild)
+        member_bucket = self.member_create_cooldowns.get_bucket(member)
+
+        retry_after = max(
+            guild_bucket.get_retry_after(), member_bucket.get_retry_after()
+        )
+        if retry_after:
+            return retry_after
+
+        guild_bucket.update_rate_limit()
+        member_bucket.update_rate_limit()
+        return None
+
+    async def create_for(
+        self, member: discord.Member, creation_channel: discord.VoiceChannel
+    ) -> bool:
+        guild = member.guild
+        overwrites = {
+            member: discord.PermissionOverwrite(connect=True, manage_channels=True)
+        }
+
+        channel, needs_edit = self.take_pooled(member)
+        if channel is not None and needs_edit:
+            try:
+                await channel.edit(
+                    name=f"{member.name}'s Channel",
+                    overwrites=overwrites,
+                    reason=f"VoiceMaster: Reused for {member}",
+                )
+                self.renames.record(channel.id)
+            except discord.HTTPException:
+                self.schedule_delete(channel)
+                channel = None
+
+        if channel is None:
+            retry_after = self.creation_retry_after(member)
+            if retry_after:
+                await self.notify_throttled(member, creation_channel, retry_after)
+                return False
+
+            channel = await guild.create_voice_channel(
+                name=f"{member.name}'s Channel",
+                overwrites=overwrites,
+                category=creation_channel.category,
+                reason=f"VoiceMaster: Created for {member}",
+            )
+
+        changed = self.registry.set_owner(guild.id, channel.id, member.id)
 
-        return await helpers.promise_channel(
-            guild=guild, channel_id=int(member.voice.channel.id)
+        try:
+            await member.move_to(channel)
+        except discord.HTTPException:
+            # Left before the move landed; let the channel go through the pool.
+            self.schedule_delete(channel)
+
+        return changed
+
+    async def notify_throttled(
+        self,
+        member: discord.Member,
+        creation_channel: discord.VoiceChannel,
+        retry_after: float,
+    ):
+        embed = Embeds.warning(
+            author=member,
+            description=(
+                "Channels are being **created too quickly**. "
+                f"Rejoin in **{retry_after:.0f}s** to get yours."
+            ),
         )
 
+        # The creation channel's text chat first, a DM if the bot can't post there.
+        try:
+            await creation_channel.send(
+                content=member.mention, embed=embed, delete_after=retry_after
+            )
+        except discord.HTTPException:
+            try:
+                await member.send(embed=embed)
+            except discord.HTTPException:
+                log.debug(f"Couldn't tell {member.id} VoiceMaster is throttled")
+
+    def owns_voicemaster(self, member: discord.Member):
+        if not member.voice or not member.voice.channel:
+            return None
+
+        channel = member.voice.channel
+        if self.registry.owner(member.guild.id, channel.id) != member.id:
+            return False
+
+        return channel
+
     @commands.group(
         name="voicemaster",
         help="A group of voicemaster related commands",
@@ -145,66 +344,67 @@ class Voicemaster(commands.Cog):
                 )
             )
 
-    @commands.Cog.listener()
-    async def on_voice_state_update(self, member, before, after):
-        guild = member.guild
+    def start_sweep(self):
+        if not self._swept:
+            self._swept = True
+            self._sweep_task = asyncio.create_task(self.sweep())
 
-        if before.channel == after.channel:
-            return
+    async def sweep(self):
+        # Channels left behind while the bot was offline or being reloaded.
+        for guild_id, channels in list(self.registry.channels.items()):
+            guild = self.bot.get_guild(guild_id)
+            if not guild:
+                continue
 
-        guild_data = await self.dbf.get_guild_data(guild_id=guild.id)
-        if not guild_data:
-            return
+            changed = False
+            for channel_id in list(channels):
+                channel = guild.get_channel(channel_id)
+                if channel is None:
+                    changed |= self.registry.remove(guild_id, channel_id)
+                else:
+                    changed |= await self.delete_if_empty(channel)
 
-        voicemaster_data = guild_data.get("VoiceMaster", {})
-        if not voicemaster_data:
-            return
+            if changed:
+                await self.save_channels(guild_id)
 
-        settings = voicemaster_data.get("Settings", {})
-        creation_channel_id = settings.get("Creation_Channel")
-        channels = voicemaster_data.get("Channels", {})
+    @commands.Cog.listener()
+    async def on_ready(self):
+        self.start_sweep()
 
-        if after.channel and creation_channel_id:
-            cid = int(creation_channel_id)
-            if after.channel.id == cid:
-                category = after.channel.category
-                overwrites = {
-                    member: discord.PermissionOverwrite(
-                        connect=True, manage_channels=True
-                    )
-                }
-
-                new_channel = await guild.create_voice_channel(
-                    name=f"{member.name}'s Channel",
-                    overwrites=overwrites,
-                    category=category,
-                    reason=f"VoiceMaster: Created for {member}",
-                )
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        self.cancel_delete(channel.id)
+        self.renames.forget(channel.id)
+        if self.registry.remove(channel.guild.id, channel.id):
+            await self.save_channels(channel.guild.id)
 
-                await member.move_to(new_channel)
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.registry.forget(guild.id)
 
-                channels[str(new_channel.id)] = {
-                    "Owner": str(member.id),
-                }
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member, before, after):
+        guild = member.guild
 
-        to_remove = []
-        for ch_id, ch_data in channels.items():
-            ch = guild.get_channel(int(ch_id))
-            if not ch:
-                to_remove.append(ch_id)
-            elif len(ch.members) == 0:
-                try:
-                    await ch.delete(reason="VoiceMaster: Channel empty")
-                except discord.Forbidden:
-                    continue
-                to_remove.append(ch_id)
+        if before.channel == after.channel or not self.registry.is_active(guild.id):
+            return
 
-        for ch_id in to_remove:
-            channels.pop(ch_id, None)
+        changed = False
+        creation_channel_id = self.registry.creation_channel(guild.id)
 
-        voicemaster_data["Channels"] = channels
-        guild_data["VoiceMaster"] = voicemaster_data
-        await self.dbf.set_guild_data(guild_id=guild.id, data=guild_data)
+        # Queue the channel being left first so the creation below can reuse it.
+        if before.channel and self.registry.is_tracked(guild.id, before.channel.id):
+            if not before.channel.members:
+                self.schedule_delete(before.channel)
+
+        if after.channel:
+            if after.channel.id == creation_channel_id:
+                changed |= await self.create_for(member, after.channel)
+            else:
+                self.cancel_delete(after.channel.id)
+
+        if changed:
+            await self.save_channels(guild.id)
 
     @voicemaster_group.command(name="setup", help="Set up the voicemaster feature")
     @commands.guild_only()
@@ -305,6 +505,7 @@ class Voicemaster(commands.Cog):
         voicemaster_data["Channels"] = channels
         guild_data["VoiceMaster"] = voicemaster_data
         await self.dbf.set_guild_data(guild_id=guild.id, data=guild_data)
+        self.registry.load_settings(guild.id, voicemaster_data)
 
         if created_channels == 0 and created_categories == 0:
             return await ctx.send(
@@ -339,7 +540,7 @@ class Voicemaster(commands.Cog):
         type=commands.BucketType.member,
     )
     async def rename_voicemaster_command(self, ctx, *, name: str):
-        channel = await self.owns_voicemaster(member=ctx.author)
+        channel = self.owns_voicemaster(member=ctx.author)
         if channel is False:
             return await ctx.send(
                 embed=Embeds.warning(
@@ -358,6 +559,7 @@ class Voicemaster(commands.Cog):
         await channel.edit(
             name=name, reason=f"Issued by {ctx.author.name} (VoiceMaster Rename)"
         )
+        self.renames.record(channel.id)
 
         await ctx.send(
             embed=Embeds.checkmark(
@@ -374,7 +576,7 @@ class Voicemaster(commands.Cog):
     @commands.guild_only()
     @commands.cooldown(rate=1, per=5, type=commands.BucketType.member)
     async def lock_voicemaster_command(self, ctx):
-        channel = await self.owns_voicemaster(member=ctx.author)
+        channel = self.owns_voicemaster(member=ctx.author)
         if channel is False:
             return await ctx.send(
                 embed=Embeds.warning(
@@ -413,7 +615,7 @@ class Voicemaster(commands.Cog):
     @commands.guild_only()
     @commands.cooldown(rate=1, per=5, type=commands.BucketType.member)
     async def unlock_voicemaster_command(self, ctx):
-        channel = await self.owns_voicemaster(member=ctx.author)
+        channel = self.owns_voicemaster(member=ctx.author)
         if channel is False:
             return await ctx.send(
                 embed=Embeds.warning(
@@ -452,7 +654,7 @@ class Voicemaster(commands.Cog):
     @commands.guild_only()
     @commands.cooldown(rate=1, per=5, type=commands.BucketType.member)
     async def hide_voicemaster_command(self, ctx):
-        channel = await self.owns_voicemaster(member=ctx.author)
+        channel = self.owns_voicemaster(member=ctx.author)
         if channel is False:
             return await ctx.send(
                 embed=Embeds.warning(
@@ -491,7 +693,7 @@ class Voicemaster(commands.Cog):
     @commands.guild_only()
     @commands.cooldown(rate=1, per=5, type=commands.BucketType.member)
     async def reveal_voicemaster_command(self, ctx):
-        channel = await self.owns_voicemaster(member=ctx.author)
+        channel = self.owns_voicemaster(member=ctx.author)
         if channel is False:
             return await ctx.send(
                 embed=Embeds.warning(
@@ -538,12 +740,8 @@ class Voicemaster(commands.Cog):
         channel = ctx.author.voice.channel
         guild = ctx.guild
 
-        guild_data = await self.dbf.get_guild_data(guild_id=guild.id)
-        voicemaster_data = guild_data.get("VoiceMaster", {})
-        voicemaster_channels = voicemaster_data.get("Channels", {})
-
-        channel_data = voicemaster_channels.get(str(channel.id))
-        if not channel_data:
+        current_owner_id = self.registry.owner(guild.id, channel.id)
+        if current_owner_id is None:
             return await ctx.send(
                 embed=Embeds.warning(
                     author=ctx.author,
@@ -551,61 +749,109 @@ class Voicemaster(commands.Cog):
                 )
             )
 
-        current_owner_id = channel_data.get("Owner")
-
-        if current_owner_id:
-            current_owner_id_int = (
-                int(current_owner_id)
-                if isinstance(current_owner_id, str)
-                else current_owner_id
+        if current_owner_id == ctx.author.id:
+            return await ctx.send(
+                embed=Embeds.warning(
+                    author=ctx.author,
+                    description="You **already own** this voice-channel.",
+                )
             )
 
-            if current_owner_id_int == ctx.author.id:
-                return await ctx.send(
-                    embed=Embeds.warning(
-                        author=ctx.author,
-                        description="You **already own** this voice-channel.",
-                    )
+        if any(member.id == current_owner_id for member in channel.members):
+            owner = guild.get_member(current_owner_id)
+            owner_name = owner.name if owner else "the current owner"
+
+            return await ctx.send(
+                embed=Embeds.warning(
+                    author=ctx.author,
+                    description=f"You **can't claim** this channel. **{owner_name}** is still in the voice-channel.",
                 )
+            )
+
+        self.registry.set_owner(guild.id, channel.id, ctx.author.id)
+        await self.save_channels(guild.id)
 
-            owner_in_channel = any(
-                member.id == current_owner_id_int for member in channel.members
+        try:
+            overwrites = channel.overwrites
+            overwrites[ctx.author] = discord.PermissionOverwrite(
+                connect=True, manage_channels=True
             )
 
-            if owner_in_channel:
-                owner = guild.get_member(current_owner_id_int)
-                owner_name = owner.name if owner else "the current owner"
+            await channel.edit(
+                overwrites=overwrites,
+                reason=f"VoiceMaster: Claimed by {ctx.author.name}",
+            )
+        except discord.Forbidden:
+            pass
 
-                return await ctx.send(
-                    embed=Embeds.warning(
-                        author=ctx.author,
-                        description=f"You **can't claim** this channel. **{owner_name}** is still in the voice-channel.",
-                    )
+        await ctx.send(
+            embed=Embeds.checkmark(
+                author=ctx.author, description="You've **claimed** this voice-channel."
+            )
+        )
+
+    @voicemaster_group.command(
+        name="transfer",
+        help="Transfer your voice channel to another member",
+        usage="(member) | @ward",
+        aliases=["give"],
+    )
+    @commands.guild_only()
+    @commands.cooldown(rate=1, per=5, type=commands.BucketType.member)
+    async def transfer_voicemaster_command(
+        self, ctx: commands.Context, member: discord.Member
+    ):
+        channel = self.owns_voicemaster(member=ctx.author)
+        if channel is False:
+            return await ctx.send(
+                embed=Embeds.warning(
+                    author=ctx.author, description="You **don't own** a voice-channel."
+                )
+            )
+        if channel is None:
+            return await ctx.send(
+                embed=Embeds.warning(
+                    author=ctx.author, description="You **aren't in** a voice-channel."
+                )
+            )
+
+        if member.id == ctx.author.id:
+            return await ctx.send(
+                embed=Embeds.warning(
+                    author=ctx.author,
+                    description="You **already own** this voice-channel.",
                 )
+            )
 
-        channel_data["Owner"] = str(ctx.author.id)
-        voicemaster_channels[str(channel.id)] = channel_data
-        voicemaster_data["Channels"] = voicemaster_channels
-        guild_data["VoiceMaster"] = voicemaster_data
+        if member not in channel.members:
+            return await ctx.send(
+                embed=Embeds.warning(
+                    author=ctx.author,
+                    description=f"**{member.name}** isn't in your voice-channel.",
+                )
+            )
 
-        await self.dbf.set_guild_data(guild_id=guild.id, data=guild_data)
+        self.registry.set_owner(ctx.guild.id, channel.id, member.id)
+        await self.save_channels(ctx.guild.id)
 
         try:
             overwrites = channel.overwrites
-            overwrites[ctx.author] = discord.PermissionOverwrite(
+            overwrites.pop(ctx.author, None)
+            overwrites[member] = discord.PermissionOverwrite(
                 connect=True, manage_channels=True
             )
 
             await channel.edit(
                 overwrites=overwrites,
-                reason=f"VoiceMaster: Claimed by {ctx.author.name}",
+                reason=f"VoiceMaster: Transferred to {member.name} by {ctx.author.name}",
             )
         except discord.Forbidden:
             pass
 
         await ctx.send(
             embed=Embeds.checkmark(
-                author=ctx.author, description="You've **claimed** this voice-channel."
+                author=ctx.author,
+                description=f"Transferred your **voice-channel** to **{member.name}**.",
             )
         )
 
@@ -1,7 +1,9 @@
 import discord, logging
 from discord.ext import commands
+from typing import Union
 
 from utils import helpers
+from utils.lookup import lookups
 
 from main import Bot
 
@@ -13,32 +15,45 @@ class GuildEvents(commands.Cog):
         self.bot = bot
 
     @commands.Cog.listener()
-    async def on_guild_role_delete(self, role: discord.Role):
-        try:
-            all_cached = await self.bot.cache.roles.get_all()
-            guild_prefix = f"{role.guild.id}:"
+    async def on_guild_role_create(self, role: discord.Role):
+        lookups.invalidate(role.guild.id, "roles")
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        if before.name != after.name:
+            lookups.invalidate(after.guild.id, "roles")
 
-            cleaned_count = 0
+    @commands.Cog.listener()
+    async def on_guild_emojis_update(self, guild: discord.Guild, before, after):
+        lookups.invalidate(guild.id, "emojis")
 
-            for cache_key, role_ids in all_cached.items():
-                if not cache_key.startswith(guild_prefix):
-                    continue
+    @commands.Cog.listener()
+    async def on_guild_stickers_update(self, guild: discord.Guild, before, after):
+        lookups.invalidate(guild.id, "stickers")
 
-                if role.id in role_ids:
-                    updated_roles = [rid for rid in role_ids if rid != role.id]
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        lookups.invalidate(guild.id)
+        self.bot.bans.forget(guild.id)
 
-                    if updated_roles:
-                        await self.bot.cache.roles.set(cache_key, updated_roles)
-                    else:
-                        await self.bot.cache.roles.delete(cache_key)
+    @commands.Cog.listener()
+    async def on_member_ban(
+        self, guild: discord.Guild, user: Union[discord.User, discord.Member]
+    ):
+        self.bot.bans.add(guild.id, user)
 
-                    cleaned_count += 1
+    @commands.Cog.listener()
+    async def on_member_unban(self, guild: discord.Guild, user: discord.User):
+        self.bot.bans.remove(guild.id, user)
 
-            try:
-                pass
-            except Exception as e:
-                log.error(f"Error cleaning role from database: {e}")
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        lookups.invalidate(role.guild.id, "roles")
 
+        try:
+            cleaned_count = self.bot.role_snapshots.discard_role(role.id)
+            if cleaned_count:
+                log.debug(f"Removed {role.id} from {cleaned_count} role snapshot(s)")
         except Exception as e:
             log.error(f"Error handling role deletion cleanup: {e}")
 
@@ -1,7 +1,8 @@
 import discord, logging
 from discord.ext import commands
 
-from utils import helpers
+from utils import helpers, metrics
+from utils.workers import WorkerPool
 
 from main import Bot
 
@@ -12,9 +13,35 @@ class MemberEvents(commands.Cog):
     def __init__(self, bot: Bot):
         self.bot = bot
         self.dbf = bot.dbf
+        self.join_workers = WorkerPool("member-join", workers=4, maxsize=5000)
+
+    async def cog_load(self):
+        self.join_workers.start()
+
+        try:
+            await self.dbf.load_flagged_members()
+        except Exception as e:
+            log.error(f"Error loading sticky role / forced nickname index: {e}")
+
+    async def cog_unload(self):
+        self.join_workers.stop()
 
     @commands.Cog.listener()
+    @metrics.timed()
     async def on_member_update(self, before: discord.Member, after: discord.Member):
+        roles_changed = before._roles != after._roles
+
+        if roles_changed:
+            try:
+                self.bot.role_snapshots.record(after.guild.id, after.id, after._roles)
+
+                log.debug(f"Recorded role snapshot for {after} in {after.guild.name}")
+            except Exception as e:
+                log.error(f"Error recording role snapshot: {e}")
+
+        if not self.dbf.is_flagged_member(after.guild.id, after.id):
+            return
+
         if before.nick != after.nick:
             try:
                 member_data = await self.dbf.get_member_data(
@@ -38,87 +65,93 @@ class MemberEvents(commands.Cog):
             except Exception as e:
                 log.error(f"Error in forced nickname check: {e}")
 
-        if before.roles != after.roles:
-            try:
-                role_ids = [
-                    role.id for role in after.roles if role != after.guild.default_role
-                ]
-
-                cache_key = f"{after.guild.id}:{after.id}"
-                await self.bot.cache.roles.set(cache_key, role_ids)
+        if not roles_changed:
+            return
 
-                log.debug(f"Updated role cache for {after} in {after.guild.name}")
-            except Exception as e:
-                log.error(f"Error updating role cache: {e}")
+        after_role_ids = set(after._roles)
+        removed_role_ids = [rid for rid in before._roles if rid not in after_role_ids]
 
-            removed_roles = set(before.roles) - set(after.roles)
+        if removed_role_ids:
+            try:
+                member_data = await self.dbf.get_member_data(
+                    guild_id=after.guild.id, member_id=after.id
+                )
+                sticky_role_ids = member_data.get("Sticky_Roles", [])
 
-            if removed_roles:
-                try:
-                    member_data = await self.dbf.get_member_data(
-                        guild_id=after.guild.id, member_id=after.id
+                if sticky_role_ids:
+                    sticky_ids = set(
+                        int(rid) if isinstance(rid, str) else rid
+                        for rid in sticky_role_ids
                     )
-                    sticky_role_ids = member_data.get("Sticky_Roles", [])
 
-                    if sticky_role_ids:
-                        sticky_ids = set(
-                            int(rid) if isinstance(rid, str) else rid
-                            for rid in sticky_role_ids
-                        )
+                    roles_to_readd = []
+                    for role_id in removed_role_ids:
+                        if role_id not in sticky_ids:
+                            continue
+
+                        role = after.guild.get_role(role_id)
+                        if role and role < after.guild.me.top_role and not role.managed:
+                            roles_to_readd.append(role)
+
+                    if roles_to_readd:
+                        try:
+                            await self.bot.role_edits.edit(
+                                after,
+                                add=roles_to_readd,
+                                reason="Sticky role - automatically re-added",
+                            )
+                            log.info(
+                                f"Re-added {len(roles_to_readd)} sticky role(s) to {after} in {after.guild.name}"
+                            )
+                        except (discord.Forbidden, discord.HTTPException) as e:
+                            log.warning(
+                                f"Failed to re-add sticky roles to {after}: {e}"
+                            )
 
-                        roles_to_readd = []
-                        for role in removed_roles:
-                            if role.id in sticky_ids:
-                                if role < after.guild.me.top_role and not role.managed:
-                                    roles_to_readd.append(role)
-
-                        if roles_to_readd:
-                            try:
-                                await after.add_roles(
-                                    *roles_to_readd,
-                                    reason="Sticky role - automatically re-added",
-                                    atomic=False,
-                                )
-                                log.info(
-                                    f"Re-added {len(roles_to_readd)} sticky role(s) to {after} in {after.guild.name}"
-                                )
-                            except (discord.Forbidden, discord.HTTPException) as e:
-                                log.warning(
-                                    f"Failed to re-add sticky roles to {after}: {e}"
-                                )
-
-                except Exception as e:
-                    log.error(f"Error in sticky role check: {e}")
+            except Exception as e:
+                log.error(f"Error in sticky role check: {e}")
 
     @commands.Cog.listener()
+    @metrics.timed()
     async def on_member_join(self, member: discord.Member):
         guild = member.guild
 
         try:
-            guild_data = await self.dbf.get_guild_data(guild_id=guild.id)
-            moderation_data = guild_data.get("Moderation", {})
-            hard_banned_users = moderation_data.get("HardBanned_Users", [])
-
-            if member.id in hard_banned_users or str(member.id) in hard_banned_users:
-                try:
-                    await guild.ban(
-                        user=member,
-                        reason="Re-applying hardban",
-                        delete_message_seconds=86400,
-                    )
-                    log.info(f"Re-banned hard-banned user {member} in {guild.name}")
-                except (discord.Forbidden, discord.HTTPException) as e:
-                    log.warning(f"Failed to re-ban hard-banned user {member}: {e}")
+            if await self.dbf.is_hardbanned(guild_id=guild.id, user_id=member.id):
+                return await self.join_workers.submit(self.reapply_hardban, member)
         except Exception as e:
             log.error(f"Error in hardban check: {e}")
 
-        member_data = {}
+        if not self.dbf.is_flagged_member(guild.id, member.id):
+            return
+
         try:
             member_data = await self.dbf.get_member_data(
-                guild_id=member.guild.id, member_id=member.id
+                guild_id=guild.id, member_id=member.id
             )
         except Exception as e:
-            log.error(f"Error fetching member data for {member}: {e}")
+            return log.error(f"Error fetching member data for {member}: {e}")
+
+        config = member_data.get("Configuration", {})
+        if config.get("Forced_Nickname") or member_data.get("Sticky_Roles"):
+            await self.join_workers.submit(
+                self.reapply_member_state, member, member_data
+            )
+
+    async def reapply_hardban(self, member: discord.Member):
+        guild = member.guild
+        try:
+            await guild.ban(
+                user=member,
+                reason="Re-applying hardban",
+                delete_message_seconds=86400,
+            )
+            log.info(f"Re-banned hard-banned user {member} in {guild.name}")
+        except (discord.Forbidden, discord.HTTPException) as e:
+            log.warning(f"Failed to re-ban hard-banned user {member}: {e}")
+
+    async def reapply_member_state(self, member: discord.Member, member_data: dict):
+        guild = member.guild
 
         try:
             config = member_data.get("Configuration", {})
@@ -155,10 +188,10 @@ class MemberEvents(commands.Cog):
 
                 if roles_to_add:
                     try:
-                        await member.add_roles(
-                            *roles_to_add,
+                        await self.bot.role_edits.edit(
+                            member,
+                            add=roles_to_add,
                             reason="Re-applying sticky roles",
-                            atomic=False,
                         )
                         log.info(
                             f"Restored {len(roles_to_add)} sticky role(s) to {member} in {guild.name}"
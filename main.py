@@ -1,10 +1,19 @@
-import discord, os, logging, asyncpg, asyncio, json, random, config
+import discord, os, logging, asyncpg, asyncio, json, random, time, config
 from logging.handlers import RotatingFileHandler
 from discord.ext import commands
 from datetime import timedelta
 from dotenv import load_dotenv
 from urllib.parse import urlparse
-from utils.cache import Cache
+from typing import Dict, Optional
+from utils.cache import Cache, MISSING
+from utils.roles import RoleEditQueue
+from utils.metrics import HandlerTimings
+from utils.snapshots import RoleSnapshotStore
+from utils.bans import BanRegistry
+from utils.rbx import RobloxService
+from utils.boot import BootProfiler, ImportProfiler
+from utils import migrations
+from utils.reloader import Reloader
 
 formatter = logging.Formatter(
     "[{asctime}] [{levelname}] {name}: {message}", style="{", datefmt="%H:%M:%S"
@@ -40,6 +49,20 @@ _database_url = os.getenv("DATABASE_URL")
 _fallback_prefix = os.getenv("FALLBACK_PREFIX")
 
 
+def load_row_data(row) -> dict:
+    if not row or row["data"] is None:
+        return {}
+    return row["data"] if isinstance(row["data"], dict) else json.loads(row["data"])
+
+
+def has_data(value) -> bool:
+    if isinstance(value, dict):
+        return any(has_data(v) for v in value.values())
+    if isinstance(value, list):
+        return len(value) > 0
+    return value is not None
+
+
 class Database:
     def __init__(self):
         self.pool = None
@@ -101,6 +124,11 @@ class Database:
                     return await self._execute_bot(conn, query, *args)
                 return await conn.execute(query, *args)
 
+    async def executemany(self, query: str, args):
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                return await conn.executemany(query, args)
+
     async def fetch(self, query: str, *args):
         async with self.pool.acquire() as conn:
             return await conn.fetch(query, *args)
@@ -173,24 +201,38 @@ class BotCache:
             namespace="snipes",
             ttl=int(timedelta(hours=2).total_seconds()),
         )
-        self.roles = Cache(
+        self.roblox_ids = Cache(
             Cache.MEMORY,
-            namespace="roles",
-            ttl=int(timedelta(hours=2).total_seconds()),
+            namespace="roblox_ids",
+            ttl=int(timedelta(hours=6).total_seconds()),
+            maxsize=5000,
         )
-        self.roblox = Cache(
+        self.roblox_profiles = Cache(
             Cache.MEMORY,
-            namespace="roblox",
+            namespace="roblox_profiles",
+            ttl=int(timedelta(hours=1).total_seconds()),
+        )
+        self.roblox_counts = Cache(
+            Cache.MEMORY,
+            namespace="roblox_counts",
             ttl=int(timedelta(minutes=2.5).total_seconds()),
         )
+        self.roblox_thumbnails = Cache(
+            Cache.MEMORY,
+            namespace="roblox_thumbnails",
+            ttl=int(timedelta(minutes=30).total_seconds()),
+        )
 
     async def clear_all(self):
         await self.guilds.clear()
         await self.members.clear()
         await self.users.clear()
         await self.config.clear()
-        await self.roles.clear()
-        await self.rbx_cookies.clear()
+        await self.snipes.clear()
+        await self.roblox_ids.clear()
+        await self.roblox_profiles.clear()
+        await self.roblox_counts.clear()
+        await self.roblox_thumbnails.clear()
 
     async def cleanup_all_expired(self) -> int:
         total = 0
@@ -198,8 +240,11 @@ class BotCache:
         total += await self.members.cleanup_expired()
         total += await self.users.cleanup_expired()
         total += await self.config.cleanup_expired()
-        total += await self.roles.cleanup_expired()
-        total += await self.rbx_cookies.cleanup_expired()
+        total += await self.snipes.cleanup_expired()
+        total += await self.roblox_ids.cleanup_expired()
+        total += await self.roblox_profiles.cleanup_expired()
+        total += await self.roblox_counts.cleanup_expired()
+        total += await self.roblox_thumbnails.cleanup_expired()
         return total
 
 
@@ -207,108 +252,26 @@ class DatabaseFunctions:
     def __init__(self, db: Database, cache: BotCache):
         self.db = db
         self.cache = cache
+        self.invalidation_hooks: dict[str, list] = {}
+        self.hardbans: dict[int, set[int]] = {}
+        # guild_id -> members with sticky roles or a forced nickname
+        self.flagged_members: dict[int, set[int]] = {}
+        self.flagged_members_loaded = False
 
-    async def init_tables(self):
-        q = """
-        CREATE TABLE IF NOT EXISTS guilds (
-            id BIGINT PRIMARY KEY,
-            data JSONB DEFAULT '{}'
-        );
-
-        CREATE TABLE IF NOT EXISTS members (
-            guild_id BIGINT NOT NULL,
-            member_id BIGINT NOT NULL,
-            data JSONB DEFAULT '{}',
-            PRIMARY KEY (guild_id, member_id)
-        );
-
-        CREATE TABLE IF NOT EXISTS users (
-            id BIGINT PRIMARY KEY,
-            data JSONB DEFAULT '{}'
-        );
-
-        CREATE TABLE IF NOT EXISTS configuration (
-            active BOOL PRIMARY KEY DEFAULT TRUE,
-            data JSONB DEFAULT '{}'
-        );
-
-        CREATE TABLE IF NOT EXISTS rbx_cookies (
-            active BOOL PRIMARY KEY DEFAULT TRUE,
-            data JSONB DEFAULT '{}'
-        );
-
-        ALTER TABLE guilds DISABLE ROW LEVEL SECURITY;
-        ALTER TABLE members DISABLE ROW LEVEL SECURITY;
-        ALTER TABLE users DISABLE ROW LEVEL SECURITY;
-        ALTER TABLE configuration DISABLE ROW LEVEL SECURITY;
-        ALTER TABLE rbx_cookies DISABLE ROW LEVEL SECURITY;
-        """
-        await self.db.execute(q, bot_update=True)
+    def add_invalidation_hook(self, table: str, callback):
+        self.invalidation_hooks.setdefault(table, []).append(callback)
 
-        await self.db.execute(
-            """
-            CREATE OR REPLACE FUNCTION notify_cache_invalidate()
-            RETURNS TRIGGER AS $$
-            BEGIN
-                -- Skip invalidation if the bot marked this transaction
-                IF current_setting('bot.is_updating', true) = 'true' THEN
-                    RETURN NEW;
-                END IF;
-
-                IF TG_TABLE_NAME = 'guilds' THEN
-                    PERFORM pg_notify('cache_invalidate', json_build_object(
-                        'table', 'guilds',
-                        'id', COALESCE(NEW.id, OLD.id)
-                    )::text);
-
-                ELSIF TG_TABLE_NAME = 'members' THEN
-                    PERFORM pg_notify('cache_invalidate', json_build_object(
-                        'table', 'members',
-                        'guild_id', COALESCE(NEW.guild_id, OLD.guild_id),
-                        'member_id', COALESCE(NEW.member_id, OLD.member_id)
-                    )::text);
-
-                ELSIF TG_TABLE_NAME = 'users' THEN
-                    PERFORM pg_notify('cache_invalidate', json_build_object(
-                        'table', 'users',
-                        'id', COALESCE(NEW.id, OLD.id)
-                    )::text);
-
-                ELSIF TG_TABLE_NAME = 'configuration' THEN
-                    PERFORM pg_notify('cache_invalidate', json_build_object(
-                        'table', 'configuration',
-                        'id', 'config'
-                    )::text);
-
-                ELSIF TG_TABLE_NAME = 'rbx_cookies' THEN
-                    PERFORM pg_notify('cache_invalidate', json_build_object(
-                        'table', 'rbx_cookies',
-                        'id', 'rbx_cookies'
-                    )::text);
-                END IF;
-
-                RETURN NEW;
-            END;
-            $$ LANGUAGE plpgsql;
-            """,
-            bot_update=True,
-        )
-
-        for table in ["guilds", "members", "users", "configuration"]:
-            await self.db.execute(
-                f"DROP TRIGGER IF EXISTS {table}_cache_trigger ON {table};",
-                bot_update=True,
-            )
-            await self.db.execute(
-                f"""
-                CREATE TRIGGER {table}_cache_trigger
-                AFTER INSERT OR UPDATE OR DELETE ON {table}
-                FOR EACH ROW EXECUTE FUNCTION notify_cache_invalidate();
-                """,
-                bot_update=True,
-            )
+    def remove_invalidation_hook(self, table: str, callback):
+        hooks = self.invalidation_hooks.get(table, [])
+        if callback in hooks:
+            hooks.remove(callback)
 
-        db_log.info("Ensured database tables & listeners")
+    async def init_tables(self):
+        applied = await migrations.migrate(self.db.pool)
+        if applied:
+            db_log.info(f"Migrated database to schema version {applied[-1]}")
+        else:
+            db_log.info(f"Database schema is at version {migrations.LATEST_VERSION}")
 
     async def handle_cache_invalidation(self, conn, pid, channel, payload):
         try:
@@ -316,55 +279,112 @@ class DatabaseFunctions:
             table = data.get("table")
 
             if table == "guilds":
-                await self.cache.guilds.delete(data["id"])
+                await self.cache.guilds.delete(str(data["id"]))
+                self.hardbans.pop(int(data["id"]), None)
             elif table == "members":
                 await self.cache.members.delete(
                     f"{data['guild_id']}:{data['member_id']}"
                 )
+                # Unknown change, so make sure the member gets checked again.
+                self.flagged_members.setdefault(int(data["guild_id"]), set()).add(
+                    int(data["member_id"])
+                )
             elif table == "users":
-                await self.cache.users.delete(data["id"])
+                await self.cache.users.delete(str(data["id"]))
             elif table == "configuration":
                 await self.cache.config.delete("config")
+
+            await self.run_invalidation_hooks(table, data)
         except Exception as e:
             db_log.error(f"Error handling cache invalidation: {e}")
 
+    async def run_invalidation_hooks(self, table: str, data: dict):
+        for callback in list(self.invalidation_hooks.get(table, [])):
+            await callback(data)
+
     # Guild
     async def get_guild_data(self, guild_id: int) -> dict:
-        cached = await self.cache.guilds.get(guild_id)
+        cached = await self.cache.guilds.get(str(guild_id))
+        if cached is MISSING:
+            return {}
         if cached is not None:
             return cached
 
         row = await self.db.fetchrow("SELECT data FROM guilds WHERE id=$1", guild_id)
-        if row:
-            data = (
-                row["data"]
-                if isinstance(row["data"], dict)
-                else json.loads(row["data"])
-            )
-        else:
-            data = {}
-            await self.db.execute(
-                "INSERT INTO guilds (id, data) VALUES ($1, $2) ON CONFLICT (id) DO NOTHING",
-                guild_id,
-                json.dumps(data),
-                bot_update=True,
-            )
-        await self.cache.guilds.set(str(guild_id), data)
+        data = load_row_data(row)
+
+        self.index_guild_data(guild_id, data)
+        await self.cache.guilds.set(str(guild_id), data if data else MISSING)
         return data
 
+    def index_guild_data(self, guild_id: int, data: dict):
+        moderation_data = data.get("Moderation", {})
+        self.hardbans[guild_id] = {
+            int(uid) for uid in moderation_data.get("HardBanned_Users", [])
+        }
+
+    async def is_hardbanned(self, guild_id: int, user_id: int) -> bool:
+        hardbans = self.hardbans.get(guild_id)
+        if hardbans is None:
+            await self.get_guild_data(guild_id)
+            hardbans = self.hardbans.get(guild_id, set())
+        return user_id in hardbans
+
     async def set_guild_data(self, guild_id: int, data: dict):
+        if not has_data(data):
+            return await self.delete_guild_data(guild_id)
+
         await self.db.execute(
             "INSERT INTO guilds (id, data) VALUES ($1, $2) ON CONFLICT (id) DO UPDATE SET data=$2",
             guild_id,
             json.dumps(data),
             bot_update=True,
         )
+        self.index_guild_data(guild_id, data)
         await self.cache.guilds.set(str(guild_id), data)
 
+    async def get_reaction_roles(self) -> dict:
+        rows = await self.db.fetch(
+            """
+            SELECT id, data->'Configuration'->'Reaction_Roles' AS reaction_roles
+            FROM guilds
+            WHERE data->'Configuration' ? 'Reaction_Roles'
+            """
+        )
+
+        reaction_roles = {}
+        for row in rows:
+            data = row["reaction_roles"]
+            if isinstance(data, str):
+                data = json.loads(data)
+            if data:
+                reaction_roles[row["id"]] = data
+        return reaction_roles
+
+    async def get_voicemaster_data(self) -> dict:
+        rows = await self.db.fetch(
+            """
+            SELECT id, data->'VoiceMaster' AS voicemaster
+            FROM guilds
+            WHERE data ? 'VoiceMaster'
+            """
+        )
+
+        voicemaster = {}
+        for row in rows:
+            data = row["voicemaster"]
+            if isinstance(data, str):
+                data = json.loads(data)
+            if data:
+                voicemaster[row["id"]] = data
+        return voicemaster
+
     # Member
     async def get_member_data(self, guild_id: int, member_id: int) -> dict:
         cache_key = f"{guild_id}:{member_id}"
         cached = await self.cache.members.get(cache_key)
+        if cached is MISSING:
+            return {}
         if cached is not None:
             return cached
 
@@ -373,25 +393,15 @@ class DatabaseFunctions:
             guild_id,
             member_id,
         )
-        if row:
-            data = (
-                row["data"]
-                if isinstance(row["data"], dict)
-                else json.loads(row["data"])
-            )
-        else:
-            data = {}
-            await self.db.execute(
-                "INSERT INTO members (guild_id, member_id, data) VALUES ($1, $2, $3) ON CONFLICT (guild_id, member_id) DO NOTHING",
-                guild_id,
-                member_id,
-                json.dumps(data),
-                bot_update=True,
-            )
-        await self.cache.members.set(cache_key, data)
+        data = load_row_data(row)
+
+        await self.cache.members.set(cache_key, data if data else MISSING)
         return data
 
     async def set_member_data(self, guild_id: int, member_id: int, data: dict):
+        if not has_data(data):
+            return await self.delete_member_data(guild_id, member_id)
+
         cache_key = f"{guild_id}:{member_id}"
         await self.db.execute(
             "INSERT INTO members (guild_id, member_id, data) VALUES ($1, $2, $3) ON CONFLICT (guild_id, member_id) DO UPDATE SET data=$3",
@@ -400,33 +410,60 @@ class DatabaseFunctions:
             json.dumps(data),
             bot_update=True,
         )
+        self.index_member_data(guild_id, member_id, data)
         await self.cache.members.set(cache_key, data)
 
+    def index_member_data(self, guild_id: int, member_id: int, data: dict):
+        config = data.get("Configuration", {})
+        flagged = self.flagged_members.setdefault(guild_id, set())
+
+        if data.get("Sticky_Roles") or config.get("Forced_Nickname"):
+            flagged.add(member_id)
+        else:
+            flagged.discard(member_id)
+
+    def is_flagged_member(self, guild_id: int, member_id: int) -> bool:
+        if not self.flagged_members_loaded:
+            return True
+        return member_id in self.flagged_members.get(guild_id, ())
+
+    async def load_flagged_members(self):
+        rows = await self.db.fetch(
+            """
+            SELECT guild_id, member_id FROM members
+            WHERE (
+                jsonb_typeof(data->'Sticky_Roles') = 'array'
+                AND jsonb_array_length(data->'Sticky_Roles') > 0
+            )
+            OR data->'Configuration'->>'Forced_Nickname' IS NOT NULL
+            """
+        )
+
+        flagged_members = {}
+        for row in rows:
+            flagged_members.setdefault(row["guild_id"], set()).add(row["member_id"])
+
+        self.flagged_members = flagged_members
+        self.flagged_members_loaded = True
+
     # User
     async def get_user_data(self, user_id: int) -> dict:
-        cached = await self.cache.users.get(user_id)
+        cached = await self.cache.users.get(str(user_id))
+        if cached is MISSING:
+            return {}
         if cached is not None:
             return cached
 
         row = await self.db.fetchrow("SELECT data FROM users WHERE id=$1", user_id)
-        if row:
-            data = (
-                row["data"]
-                if isinstance(row["data"], dict)
-                else json.loads(row["data"])
-            )
-        else:
-            data = {}
-            await self.db.execute(
-                "INSERT INTO users (id, data) VALUES ($1, $2) ON CONFLICT (id) DO NOTHING",
-                user_id,
-                json.dumps(data),
-                bot_update=True,
-            )
-        await self.cache.users.set(str(user_id), data)
+        data = load_row_data(row)
+
+        await self.cache.users.set(str(user_id), data if data else MISSING)
         return data
 
     async def set_user_data(self, user_id: int, data: dict):
+        if not has_data(data):
+            return await self.delete_user_data(user_id)
+
         await self.db.execute(
             "INSERT INTO users (id, data) VALUES ($1, $2) ON CONFLICT (id) DO UPDATE SET data=$2",
             user_id,
@@ -490,13 +527,18 @@ class DatabaseFunctions:
             json.dumps(data),
             bot_update=True,
         )
+        # Our own writes skip NOTIFY, so refresh local listeners directly.
+        await self.run_invalidation_hooks(
+            "rbx_cookies", {"table": "rbx_cookies", "id": "rbx_cookies"}
+        )
 
     # Delete / clear helpers
     async def delete_guild_data(self, guild_id: int):
         await self.db.execute(
             "DELETE FROM guilds WHERE id=$1", guild_id, bot_update=True
         )
-        await self.cache.guilds.delete(str(guild_id))
+        self.hardbans[guild_id] = set()
+        await self.cache.guilds.set(str(guild_id), MISSING)
 
     async def delete_member_data(self, guild_id: int, member_id: int):
         await self.db.execute(
@@ -505,25 +547,41 @@ class DatabaseFunctions:
             member_id,
             bot_update=True,
         )
-        await self.cache.members.delete(f"{guild_id}:{member_id}")
+        self.flagged_members.get(guild_id, set()).discard(member_id)
+        await self.cache.members.set(f"{guild_id}:{member_id}", MISSING)
 
     async def deep_delete_member_data(self, member_id: int):
         await self.db.execute(
             "DELETE FROM members WHERE member_id=$1", member_id, bot_update=True
         )
 
+        for flagged in self.flagged_members.values():
+            flagged.discard(member_id)
+
         member_str = f":{member_id}"
         await self.cache.members.delete_pattern(member_str)
 
     async def delete_user_data(self, user_id: int):
         await self.db.execute("DELETE FROM users WHERE id=$1", user_id, bot_update=True)
-        await self.cache.users.delete(str(user_id))
+        await self.cache.users.set(str(user_id), MISSING)
 
     async def delete_roblox_cookie_data(self):
         await self.db.execute(
             "DELETE FROM rbx_cookies WHERE active=TRUE", bot_update=True
         )
-        await self.cache.rbx_cookies.clear()
+        await self.run_invalidation_hooks(
+            "rbx_cookies", {"table": "rbx_cookies", "id": "rbx_cookies"}
+        )
+
+    async def vacuum_empty_rows(self) -> dict:
+        counts = {}
+        for table in ("guilds", "members", "users"):
+            status = await self.db.execute(
+                f"DELETE FROM {table} WHERE data IS NULL OR data = '{{}}'::jsonb",
+                bot_update=True,
+            )
+            counts[table] = int(status.split()[-1])
+        return counts
 
     async def clear_cache(self):
         await self.cache.clear_all()
@@ -537,7 +595,7 @@ intents.moderation = True
 
 
 class Bot(commands.Bot):
-    def __init__(self):
+    def __init__(self, boot: Optional[BootProfiler] = None):
         super().__init__(
             intents=intents,
             command_prefix=self.get_prefix,
@@ -549,23 +607,55 @@ class Bot(commands.Bot):
         self.db = Database()
         self.cache = BotCache()
         self.dbf = DatabaseFunctions(self.db, self.cache)
+        self.role_edits = RoleEditQueue()
+        self.timings = HandlerTimings()
+        self.role_snapshots = RoleSnapshotStore(self.db)
+        self.bans = BanRegistry()
+        self.roblox = RobloxService(self.dbf, self.cache)
+        self.boot = boot or BootProfiler()
+        self.reloader = Reloader(self)
+        self._setup_done: Optional[float] = None
         self._fallback_prefix = _fallback_prefix
         self.bp = "•"
 
         self.add_check(self.guild_whitelist_check)
 
+        async def load_cog(module: str):
+            start = time.perf_counter()
+            try:
+                await self.load_extension(module)
+            except Exception as err:
+                cog_log.error(f"Failed to load {module}: {err}")
+                return
+            finally:
+                self.cog_timings[module] = time.perf_counter() - start
+
+            cog_log.info(f"Loaded {module} in {self.cog_timings[module] * 1000:.0f}ms")
+
         async def load_cogs():
+            modules = []
             for root, _, files in os.walk("cogs"):
-                for file in files:
+                for file in sorted(files):
                     if file.endswith(".py") and not file.startswith("__"):
                         rel_path = os.path.relpath(os.path.join(root, file), ".")
-                        module = rel_path.replace(os.sep, ".")[:-3]
-                        try:
-                            await self.load_extension(module)
-                            cog_log.info(f"Loaded {module}")
-                        except Exception as err:
-                            cog_log.error(f"Failed to load {module}: {err}")
+                        modules.append(rel_path.replace(os.sep, ".")[:-3])
+
+            # Imports still run one at a time, but each cog's async setup
+            # (cog_load, DB reads) overlaps with the others.
+            start = time.perf_counter()
+            await asyncio.gather(*(load_cog(module) for module in modules))
+            elapsed = time.perf_counter() - start
+            self.reloader.snapshot()
+
+            slowest = sorted(self.cog_timings.items(), key=lambda i: i[1], reverse=True)
+            cog_log.info(
+                f"Loaded {len(self.extensions)}/{len(modules)} cogs in "
+                f"{elapsed * 1000:.0f}ms (slowest: "
+                + ", ".join(f"{m} {t * 1000:.0f}ms" for m, t in slowest[:5])
+                + ")"
+            )
 
+        self.cog_timings: Dict[str, float] = {}
         self.load_cogs = load_cogs
 
     async def guild_whitelist_check(self, ctx: commands.Context):
@@ -638,20 +728,41 @@ class Bot(commands.Bot):
 
     async def setup_hook(self):
         log.info("Connecting to database...")
-        await self.db.connect()
-        await self.dbf.init_tables()
-        await self.db.start_listener(self.dbf.handle_cache_invalidation)
+        with self.boot.phase("db.connect"):
+            await self.db.connect()
+        with self.boot.phase("init_tables"):
+            await self.dbf.init_tables()
+        with self.boot.phase("start_listener"):
+            await self.db.start_listener(self.dbf.handle_cache_invalidation)
+        self.role_snapshots.start()
         log.info("Loading cogs...")
-        await self.load_cogs()
+        with self.boot.phase("load_cogs"):
+            await self.load_cogs()
+        self._setup_done = time.perf_counter()
+
+    def report_boot(self):
+        if self.boot.reported:
+            return
+        self.boot.reported = True
+
+        if self.boot.imports is not None:
+            self.boot.imports.uninstall()
+        for line in self.boot.summary(self.cog_timings):
+            log.info(line)
 
     async def close(self):
         log.info("Shutting down...")
+        await self.role_snapshots.stop()
         await self.db.close()
         await super().close()
 
     async def on_ready(self):
         log.info(f"Logged in as {self.user.name}")
 
+        if not self.boot.reported and self._setup_done is not None:
+            self.boot.record("gateway", time.perf_counter() - self._setup_done)
+        self.report_boot()
+
         config: dict = await self.dbf.get_configuration()
         status_data: dict = config.get("Statuses", {})
 
@@ -676,7 +787,26 @@ class Bot(commands.Bot):
 
 
 async def main():
-    import platform, sys, psutil
+    import argparse, platform, sys, psutil
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--profile-imports",
+        action="store_true",
+        help="include an import-time tree in the boot report",
+    )
+    parser.add_argument(
+        "--exit-after-setup",
+        action="store_true",
+        help="run setup (database and cogs) without logging in, report and exit",
+    )
+    args = parser.parse_args()
+
+    imports = None
+    if args.profile_imports:
+        imports = ImportProfiler()
+        imports.install()
+    boot = BootProfiler(imports)
 
     def system_banner():
         os_info = f"{platform.system()} {platform.release()}"
@@ -703,9 +833,18 @@ async def main():
             print(f"│ {line.ljust(width - 4)} │")
         print("└" + "─" * (width - 2) + "┘")
 
-    system_banner()
+    with boot.phase("banner"):
+        system_banner()
+
+    with boot.phase("Bot()"):
+        bot = Bot(boot)
+
+    if args.exit_after_setup:
+        async with bot:
+            await bot.setup_hook()
+            bot.report_boot()
+        return
 
-    bot = Bot()
     log.info("Starting bot...")
     await bot.start(_token)
 
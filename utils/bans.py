@@ -0,0 +1,76 @@
+import discord, asyncio, logging
+from typing import Dict, List, Optional, Tuple
+
+from utils import helpers
+
+log = logging.getLogger("Bans")
+
+
+class BanRegistry:
+    def __init__(self):
+        self.bans: Dict[int, Dict[int, discord.BanEntry]] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+        # Ban/unban events seen while a guild's ban list is still paging in.
+        self._pending: Dict[int, List[Tuple[bool, discord.abc.User]]] = {}
+
+    def is_loaded(self, guild_id: int) -> bool:
+        return guild_id in self.bans
+
+    async def load(self, guild: discord.Guild) -> Optional[Dict[int, discord.BanEntry]]:
+        bans = self.bans.get(guild.id)
+        if bans is not None:
+            return bans
+
+        lock = self._locks.setdefault(guild.id, asyncio.Lock())
+        async with lock:
+            bans = self.bans.get(guild.id)
+            if bans is not None:
+                return bans
+
+            self._pending[guild.id] = []
+            try:
+                bans = {entry.user.id: entry async for entry in guild.bans(limit=None)}
+            except (discord.Forbidden, discord.HTTPException) as e:
+                log.debug(f"Couldn't load bans for {guild.id}: {e}")
+                return None
+            finally:
+                pending = self._pending.pop(guild.id, [])
+
+            for banned, user in pending:
+                if banned:
+                    bans.setdefault(user.id, discord.BanEntry(reason=None, user=user))
+                else:
+                    bans.pop(user.id, None)
+
+            self.bans[guild.id] = bans
+            return bans
+
+    async def is_banned(self, guild: discord.Guild, user: discord.abc.Snowflake) -> bool:
+        bans = await self.load(guild)
+        if bans is None:
+            return await helpers.promise_ban_entry(guild=guild, user=user) is not None
+        return user.id in bans
+
+    async def entries(self, guild: discord.Guild) -> Optional[List[discord.BanEntry]]:
+        bans = await self.load(guild)
+        return None if bans is None else list(bans.values())
+
+    def add(self, guild_id: int, user: discord.abc.User, reason: Optional[str] = None):
+        if guild_id in self._pending:
+            self._pending[guild_id].append((True, user))
+
+        bans = self.bans.get(guild_id)
+        if bans is not None:
+            bans[user.id] = discord.BanEntry(reason=reason, user=user)
+
+    def remove(self, guild_id: int, user: discord.abc.User):
+        if guild_id in self._pending:
+            self._pending[guild_id].append((False, user))
+
+        bans = self.bans.get(guild_id)
+        if bans is not None:
+            bans.pop(user.id, None)
+
+    def forget(self, guild_id: int):
+        self.bans.pop(guild_id, None)
+        self._locks.pop(guild_id, None)
@@ -0,0 +1,102 @@
+import builtins, contextlib, sys, time
+from typing import Dict, Iterator, List, Optional
+
+
+class ImportNode:
+    __slots__ = ("name", "elapsed", "children")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.elapsed = 0.0
+        self.children: List["ImportNode"] = []
+
+
+class ImportProfiler:
+    """Times first imports as a tree, like ``python -X importtime``.
+
+    Only imports that run after ``install`` are seen, so modules main.py pulls
+    in before parsing its arguments are not part of the tree.
+    """
+
+    def __init__(self):
+        self.root = ImportNode("<boot>")
+        self._stack: List[ImportNode] = [self.root]
+        self._original = None
+
+    def install(self):
+        if self._original is None:
+            self._original = builtins.__import__
+            builtins.__import__ = self._import
+
+    def uninstall(self):
+        if self._original is not None:
+            builtins.__import__ = self._original
+            self._original = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self._original(name, globals, locals, fromlist, level)
+
+        node = ImportNode(name)
+        self._stack[-1].children.append(node)
+        self._stack.append(node)
+
+        start = time.perf_counter()
+        try:
+            return self._original(name, globals, locals, fromlist, level)
+        finally:
+            node.elapsed = time.perf_counter() - start
+            self._stack.pop()
+
+    def render(self, min_ms: float = 5.0) -> List[str]:
+        lines = []
+
+        def walk(node: ImportNode, depth: int):
+            for child in sorted(node.children, key=lambda n: n.elapsed, reverse=True):
+                if child.elapsed * 1000 < min_ms:
+                    continue
+                lines.append(f"{'  ' * depth}{child.name} {child.elapsed * 1000:.1f}ms")
+                walk(child, depth + 1)
+
+        walk(self.root, 0)
+        return lines
+
+
+class BootProfiler:
+    def __init__(self, imports: Optional[ImportProfiler] = None):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.imports = imports
+        self.reported = False
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, elapsed: float):
+        self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def summary(
+        self, cogs: Optional[Dict[str, float]] = None, top: int = 10
+    ) -> List[str]:
+        lines = [f"Boot finished in {self.elapsed * 1000:.0f}ms"]
+        lines += [f"  {name:<16} {t * 1000:8.0f}ms" for name, t in self.phases.items()]
+
+        if cogs:
+            lines.append("Slowest cogs:")
+            slowest = sorted(cogs.items(), key=lambda i: i[1], reverse=True)
+            lines += [f"  {name:<40} {t * 1000:8.0f}ms" for name, t in slowest[:top]]
+
+        if self.imports is not None:
+            lines.append("Imports:")
+            lines += [f"  {line}" for line in self.imports.render()]
+
+        return lines
@@ -4,6 +4,17 @@ from typing import Any, Optional, Dict
 from collections import OrderedDict
 
 
+class Missing:
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "<MISSING>"
+
+
+# Cached in place of a row that doesn't exist, so repeated misses skip the DB.
+MISSING = Missing()
+
+
 class CacheEntry:
     __slots__ = ("value", "expires_at")
 
@@ -1,14 +1,88 @@
 import re
-from typing import List
+from typing import Dict, List, Optional, Sequence, Tuple
 from discord.ext import commands
 import discord
-from rapidfuzz import fuzz, process
+
+from utils.lookup import RoleIndex, lookups
 
 
 ROLE_MENTION_RE = re.compile(r"^<@&(?P<id>\d+)>$")
 ID_RE = re.compile(r"^\d{17,20}$")
 
 
+def get_role_index(guild: discord.Guild) -> RoleIndex:
+    return lookups.roles(guild)
+
+
+def resolve_role(
+    guild: discord.Guild, argument: str, threshold: int = 70
+) -> Optional[discord.Role]:
+    m = ROLE_MENTION_RE.match(argument)
+    if m:
+        return guild.get_role(int(m.group("id")))
+
+    if ID_RE.match(argument):
+        role = guild.get_role(int(argument))
+        if role:
+            return role
+
+    return get_role_index(guild).find(argument, threshold=threshold)
+
+
+def match_span(
+    guild: discord.Guild,
+    words: Sequence[str],
+    start: int,
+    max_words: int,
+    matches: Dict[str, Optional[discord.Role]],
+) -> Tuple[Optional[discord.Role], int]:
+    m = ROLE_MENTION_RE.match(words[start])
+    if m:
+        return guild.get_role(int(m.group("id"))), 1
+
+    if ID_RE.match(words[start]):
+        role = guild.get_role(int(words[start]))
+        if role:
+            return role, 1
+
+    # Longest phrase first, shrinking until something matches, so a typo like
+    # "red tem" still lands on "Red Team" instead of two single-word guesses.
+    for end in range(min(len(words), start + max_words), start, -1):
+        role = matches.get(" ".join(words[start:end]))
+        if role:
+            return role, end - start
+
+    return None, 1
+
+
+def parse_roles(
+    guild: discord.Guild, words: Sequence[str], threshold: int = 70
+) -> List[Tuple[Optional[discord.Role], str]]:
+    index = get_role_index(guild)
+    lowered = [w.lower() for w in words]
+    exact = [index.longest_match(lowered, i) for i in range(len(words))]
+
+    # Every span the trie can't place is scored up front in one batch.
+    spans = []
+    for i, (role, _) in enumerate(exact):
+        if role is None and not ROLE_MENTION_RE.match(words[i]):
+            for end in range(min(len(words), i + index.max_words), i, -1):
+                spans.append(" ".join(words[i:end]))
+    matches = index.find_phrases(spans, threshold) if spans else {}
+
+    results = []
+    i = 0
+    while i < len(words):
+        role, span = exact[i]
+        if role is None:
+            role, span = match_span(guild, words, i, index.max_words, matches)
+
+        results.append((role, " ".join(words[i : i + span])))
+        i += span
+
+    return results
+
+
 class PartialRole(commands.Converter):
     def __init__(self, threshold: int = 70):
         self.threshold = threshold
@@ -26,36 +100,8 @@ class PartialRole(commands.Converter):
                 return role
             raise commands.BadArgument(f"No role found with ID {role_id}.")
 
-        if ID_RE.match(argument):
-            try:
-                role_id = int(argument)
-                role = guild.get_role(role_id)
-                if role:
-                    return role
-            except Exception:
-                pass
-
-        roles: List[discord.Role] = [r for r in guild.roles if r.name != "@everyone"]
-        role_names = [r.name for r in roles]
-
-        arg_lower = argument.lower()
-        for role in roles:
-            if role.name.lower() == arg_lower:
-                return role
-
-        substring_matches = []
-        for role in roles:
-            if arg_lower in role.name.lower():
-                substring_matches.append(role)
-        if substring_matches:
-            substring_matches.sort(key=lambda r: len(r.name))
-            return substring_matches[0]
-
-        match = process.extractOne(argument, role_names, scorer=fuzz.WRatio)
-        if match and match[1] >= self.threshold:
-            matched_name = match[0]
-            for role in roles:
-                if role.name == matched_name:
-                    return role
+        role = resolve_role(guild, argument, threshold=self.threshold)
+        if role:
+            return role
 
         raise commands.BadArgument(f"No role found matching '{argument}'.")
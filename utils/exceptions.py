@@ -1,11 +1,33 @@
 import discord
 from discord.ext import commands
+from typing import Optional
+
+from utils.messages import Embeds
 
 
 class HierarchyCheckError(Exception):
-    def __init__(self, embed: discord.Embed):
-        self.embed = embed
-        super().__init__("Hierarchy check failed.")
+    def __init__(
+        self,
+        embed: Optional[discord.Embed] = None,
+        *,
+        author: Optional[discord.abc.User] = None,
+        description: Optional[str] = None,
+        verdict: int = 0,
+    ):
+        self._embed = embed
+        self.author = author
+        self.description = description
+        self.verdict = verdict
+        super().__init__(description or "Hierarchy check failed.")
+
+    @property
+    def embed(self) -> discord.Embed:
+        # Built on first access so checks that only need the verdict stay cheap.
+        if self._embed is None:
+            self._embed = Embeds.warning(
+                author=self.author, description=self.description
+            )
+        return self._embed
 
 
 class MaxDurationExceeded(Exception):
@@ -1,12 +1,13 @@
 import discord, re, aiohttp, time, logging
 from discord.ext import commands
 from io import BytesIO
-from PIL import Image
-from datetime import timedelta
-from typing import Optional, Union, Dict, Any, List
+from typing import TYPE_CHECKING, Optional, Union, Dict, Any, List
 from collections import Counter
 from utils import exceptions
 
+if TYPE_CHECKING:
+    from PIL import Image
+
 log = logging.getLogger("Helpers")
 
 
@@ -224,19 +225,60 @@ def parse_flags(
     return result
 
 
-async def image_primary_colour(url: str) -> discord.Colour:
+MAX_IMAGE_BYTES = 8 * 1024 * 1024
+MAX_IMAGE_PIXELS = 4096 * 4096
+COLOUR_SAMPLE_SIZE = (150, 150)
+
+
+async def fetch_image_bytes(url: str, max_bytes: int = MAX_IMAGE_BYTES) -> BytesIO:
+    data = BytesIO()
+
     async with aiohttp.ClientSession() as session:
         async with session.get(url) as resp:
             if resp.status != 200:
                 raise ValueError("Failed to fetch image from URL")
-            data = BytesIO(await resp.read())
 
-    img = Image.open(data).convert("RGB")
-    img = img.resize((150, 150))
+            if resp.content_length is not None and resp.content_length > max_bytes:
+                raise ValueError(
+                    f"Image is too large ({resp.content_length} > {max_bytes} bytes)"
+                )
+
+            async for chunk in resp.content.iter_chunked(64 * 1024):
+                if data.tell() + len(chunk) > max_bytes:
+                    raise ValueError(f"Image is too large (> {max_bytes} bytes)")
+                data.write(chunk)
+
+    data.seek(0)
+    return data
+
+
+def open_image_sample(data: BytesIO, size: tuple = COLOUR_SAMPLE_SIZE) -> "Image.Image":
+    from PIL import Image
 
-    pixels = list(img.getdata())
+    img = Image.open(data)
 
-    pixel_counts = Counter(pixels)
+    # JPEG can decode straight at 1/2, 1/4 or 1/8 scale; other formats
+    # are reduced right after decoding so only the sample stays alive.
+    if img.format == "JPEG":
+        img.draft("RGB", size)
+
+    # Capped on the size that will actually be decoded, so large photos that
+    # draft() shrinks aren't refused.
+    width, height = img.size
+    if width * height > MAX_IMAGE_PIXELS:
+        raise ValueError(f"Image is too large ({width}x{height})")
+
+    img.thumbnail(size, reducing_gap=2.0)
+    return img.convert("RGB")
+
+
+async def image_primary_colour(url: str) -> discord.Colour:
+    data = await fetch_image_bytes(url)
+
+    img = open_image_sample(data)
+    img = img.resize(COLOUR_SAMPLE_SIZE)
+
+    pixel_counts = Counter(img.getdata())
     top_colors = pixel_counts.most_common(10)
 
     def calculate_vibrancy(rgb):
@@ -290,20 +332,10 @@ def build_duration(timestamp: int | float, max_length: int = None) -> str:
 async def role_cache_entry(self, guild: discord.Guild, member: discord.Member):
     try:
         role_ids = [role.id for role in member.roles if role != guild.default_role]
-
-        if role_ids:
-            cache_key = f"{guild.id}:{member.id}"
-            await self.bot.cache.roles.set(
-                cache_key,
-                role_ids,
-                ttl=int(timedelta(hours=2).total_seconds()),
-            )
+        self.bot.role_snapshots.record(guild.id, member.id, role_ids)
     except Exception as e:
         log.error(f"Error caching roles: {e}")
 
 
 async def role_delete_entry(self, guild: discord.Guild, member: discord.Member):
-    cache_key = f"{guild.id}:{member.id}"
-
-    if await self.bot.cache.roles.get(cache_key):
-        await self.bot.cache.roles.delete(cache_key)
+    await self.bot.role_snapshots.delete(guild.id, member.id)
@@ -0,0 +1,221 @@
+import discord
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+def default_process(text: str) -> str:
+    from rapidfuzz.utils import default_process
+
+    return default_process(text)
+
+
+def extract_one(query: str, choices: List[str], scorer: str, threshold: int):
+    # rapidfuzz is only imported once something actually needs fuzzy matching.
+    from rapidfuzz import fuzz, process
+
+    return process.extractOne(
+        query,
+        choices,
+        scorer=getattr(fuzz, scorer),
+        processor=None,
+        score_cutoff=threshold,
+    )
+
+
+class NameIndex:
+    def __init__(self, items: Iterable[Any], names: Optional[Iterable[str]] = None):
+        self.items = list(items)
+        self.names = (
+            list(names) if names is not None else [item.name for item in self.items]
+        )
+
+        self.by_name: Dict[str, Any] = {}
+        for item, name in zip(self.items, self.names):
+            self.by_name.setdefault(name.lower(), item)
+
+        self._processed_names: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @property
+    def processed_names(self) -> List[str]:
+        if self._processed_names is None:
+            self._processed_names = [default_process(n) for n in self.names]
+        return self._processed_names
+
+    def get(self, name: str) -> Optional[Any]:
+        return self.by_name.get(name.lower())
+
+    def fuzzy(
+        self, query: str, threshold: int = 70, scorer: str = "WRatio"
+    ) -> Optional[Any]:
+        match = extract_one(
+            default_process(query), self.processed_names, scorer, threshold
+        )
+        return self.items[match[2]] if match else None
+
+    def fuzzy_many(
+        self,
+        queries: Sequence[str],
+        threshold: int = 70,
+        scorer: str = "WRatio",
+    ) -> List[Optional[Any]]:
+        from rapidfuzz import fuzz, process
+
+        processed = [default_process(q) for q in queries]
+        unique = list(dict.fromkeys(processed))
+        if not unique or not self.items:
+            return [None] * len(queries)
+
+        # One score matrix for every distinct query against the shared choices.
+        scores = process.cdist(
+            unique,
+            self.processed_names,
+            scorer=getattr(fuzz, scorer),
+            processor=None,
+            score_cutoff=threshold,
+        )
+        best = scores.argmax(axis=1)
+
+        matches = {
+            query: self.items[col] if scores[row, col] >= threshold else None
+            for row, (query, col) in enumerate(zip(unique, best))
+        }
+        return [matches[query] for query in processed]
+
+    def find(
+        self, query: str, threshold: int = 70, scorer: str = "WRatio"
+    ) -> Optional[Any]:
+        return self.get(query) or self.fuzzy(query, threshold=threshold, scorer=scorer)
+
+
+class SubstringIndex(NameIndex):
+    def __init__(self, items: Iterable[Any]):
+        super().__init__(items)
+
+        # Shortest names first, so the first substring hit is the closest one.
+        self.by_length = sorted(self.items, key=lambda item: len(item.name))
+        self.lower_names = [item.name.lower() for item in self.by_length]
+
+    def substring(self, argument: str) -> Optional[Any]:
+        arg_lower = argument.lower()
+        for index, name in enumerate(self.lower_names):
+            if arg_lower in name:
+                return self.by_length[index]
+        return None
+
+    def find(self, argument: str, threshold: int = 70) -> Optional[Any]:
+        return (
+            self.get(argument)
+            or self.substring(argument)
+            or self.fuzzy(argument, threshold=threshold)
+        )
+
+    def find_many(
+        self, arguments: Sequence[str], threshold: int = 70
+    ) -> List[Optional[Any]]:
+        results = [self.get(arg) or self.substring(arg) for arg in arguments]
+
+        missing = [i for i, item in enumerate(results) if item is None]
+        if missing:
+            matches = self.fuzzy_many([arguments[i] for i in missing], threshold)
+            for i, item in zip(missing, matches):
+                results[i] = item
+
+        return results
+
+
+class RoleIndex(SubstringIndex):
+    def __init__(self, guild: discord.Guild):
+        super().__init__(r for r in guild.roles if r.name != "@everyone")
+        self.roles: List[discord.Role] = self.items
+
+        # Word trie over lowercase names for longest-match phrase parsing.
+        self.trie: dict = {}
+        for role in self.roles:
+            node = self.trie
+            for word in role.name.lower().split():
+                node = node.setdefault(word, {})
+            node.setdefault(None, role)
+
+        # A phrase is only compared with names of the same word count, so a long
+        # span can't partially match a short name and swallow the words after it.
+        groups: Dict[int, List[discord.Role]] = {}
+        for role in self.roles:
+            groups.setdefault(len(role.name.split()) or 1, []).append(role)
+        self.by_words = {
+            count: SubstringIndex(roles) for count, roles in groups.items()
+        }
+        self.max_words = max(groups, default=1)
+
+    def longest_match(
+        self, words: Sequence[str], start: int
+    ) -> Tuple[Optional[discord.Role], int]:
+        node = self.trie
+        matched, span = None, 0
+
+        for offset in range(start, len(words)):
+            node = node.get(words[offset])
+            if node is None:
+                break
+            if None in node:
+                matched, span = node[None], offset - start + 1
+
+        return matched, span
+
+    def find_phrases(
+        self, phrases: Sequence[str], threshold: int = 70
+    ) -> Dict[str, Optional[discord.Role]]:
+        by_count: Dict[int, List[str]] = {}
+        for phrase in dict.fromkeys(phrases):
+            by_count.setdefault(len(phrase.split()), []).append(phrase)
+
+        # One batched search per word count, against the names of that length.
+        results: Dict[str, Optional[discord.Role]] = {}
+        for count, group_phrases in by_count.items():
+            group = self.by_words.get(count)
+            matches = (
+                group.find_many(group_phrases, threshold)
+                if group
+                else [None] * len(group_phrases)
+            )
+            results.update(zip(group_phrases, matches))
+        return results
+
+
+class GuildLookups:
+    # kind -> (index factory, source length used to spot stale indexes)
+    KINDS: Dict[str, Tuple[Callable, Callable]] = {
+        "roles": (RoleIndex, lambda g: len(g.roles)),
+        "emojis": (lambda g: NameIndex(g.emojis), lambda g: len(g.emojis)),
+        "stickers": (lambda g: NameIndex(g.stickers), lambda g: len(g.stickers)),
+    }
+
+    def __init__(self):
+        self._indexes: Dict[Tuple[str, int], Tuple[int, NameIndex]] = {}
+
+    def get(self, guild: discord.Guild, kind: str) -> NameIndex:
+        factory, size = self.KINDS[kind]
+        key = (kind, guild.id)
+
+        entry = self._indexes.get(key)
+        if entry is None or entry[0] != size(guild):
+            entry = self._indexes[key] = (size(guild), factory(guild))
+        return entry[1]
+
+    def roles(self, guild: discord.Guild) -> RoleIndex:
+        return self.get(guild, "roles")
+
+    def emojis(self, guild: discord.Guild) -> NameIndex:
+        return self.get(guild, "emojis")
+
+    def stickers(self, guild: discord.Guild) -> NameIndex:
+        return self.get(guild, "stickers")
+
+    def invalidate(self, guild_id: int, kind: Optional[str] = None):
+        kinds = [kind] if kind else list(self.KINDS)
+        for k in kinds:
+            self._indexes.pop((k, guild_id), None)
+
+
+lookups = GuildLookups()
@@ -0,0 +1,57 @@
+import time, functools
+from typing import Dict, List, Optional
+
+
+class TimingStats:
+    __slots__ = ("calls", "total", "max")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.calls if self.calls else 0.0
+
+
+class HandlerTimings:
+    def __init__(self):
+        self.stats: Dict[str, TimingStats] = {}
+
+    def record(self, name: str, elapsed: float):
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = TimingStats()
+
+        stats.calls += 1
+        stats.total += elapsed
+        if elapsed > stats.max:
+            stats.max = elapsed
+
+    def snapshot(self) -> List[tuple]:
+        return sorted(
+            ((name, s.calls, s.mean, s.max, s.total) for name, s in self.stats.items()),
+            key=lambda item: item[4],
+            reverse=True,
+        )
+
+    def reset(self):
+        self.stats.clear()
+
+
+def timed(name: Optional[str] = None):
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(self, *args, **kwargs)
+            finally:
+                self.bot.timings.record(label, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,210 @@
+import asyncpg, logging
+from typing import List, Tuple
+
+log = logging.getLogger("Database")
+
+# Arbitrary key for pg_advisory_xact_lock so only one process migrates at a time.
+MIGRATION_LOCK_ID = 7_305_114_201
+
+# (version, name, sql). Append only: never edit a migration that has shipped.
+# The first ones use IF NOT EXISTS / OR REPLACE so they also apply cleanly to
+# databases created by the old init_tables.
+MIGRATIONS: List[Tuple[int, str, str]] = [
+    (
+        1,
+        "base tables",
+        """
+        CREATE TABLE IF NOT EXISTS guilds (
+            id BIGINT PRIMARY KEY,
+            data JSONB DEFAULT '{}'
+        );
+
+        CREATE TABLE IF NOT EXISTS members (
+            guild_id BIGINT NOT NULL,
+            member_id BIGINT NOT NULL,
+            data JSONB DEFAULT '{}',
+            PRIMARY KEY (guild_id, member_id)
+        );
+
+        CREATE TABLE IF NOT EXISTS users (
+            id BIGINT PRIMARY KEY,
+            data JSONB DEFAULT '{}'
+        );
+
+        CREATE TABLE IF NOT EXISTS configuration (
+            active BOOL PRIMARY KEY DEFAULT TRUE,
+            data JSONB DEFAULT '{}'
+        );
+
+        CREATE TABLE IF NOT EXISTS rbx_cookies (
+            active BOOL PRIMARY KEY DEFAULT TRUE,
+            data JSONB DEFAULT '{}'
+        );
+
+        ALTER TABLE guilds DISABLE ROW LEVEL SECURITY;
+        ALTER TABLE members DISABLE ROW LEVEL SECURITY;
+        ALTER TABLE users DISABLE ROW LEVEL SECURITY;
+        ALTER TABLE configuration DISABLE ROW LEVEL SECURITY;
+        ALTER TABLE rbx_cookies DISABLE ROW LEVEL SECURITY;
+        """,
+    ),
+    (
+        2,
+        "cache invalidation triggers",
+        """
+        CREATE OR REPLACE FUNCTION notify_cache_invalidate()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            -- Skip invalidation if the bot marked this transaction
+            IF current_setting('bot.is_updating', true) = 'true' THEN
+                RETURN NEW;
+            END IF;
+
+            IF TG_TABLE_NAME = 'guilds' THEN
+                PERFORM pg_notify('cache_invalidate', json_build_object(
+                    'table', 'guilds',
+                    'id', COALESCE(NEW.id, OLD.id)
+                )::text);
+
+            ELSIF TG_TABLE_NAME = 'members' THEN
+                PERFORM pg_notify('cache_invalidate', json_build_object(
+                    'table', 'members',
+                    'guild_id', COALESCE(NEW.guild_id, OLD.guild_id),
+                    'member_id', COALESCE(NEW.member_id, OLD.member_id)
+                )::text);
+
+            ELSIF TG_TABLE_NAME = 'users' THEN
+                PERFORM pg_notify('cache_invalidate', json_build_object(
+                    'table', 'users',
+                    'id', COALESCE(NEW.id, OLD.id)
+                )::text);
+
+            ELSIF TG_TABLE_NAME = 'configuration' THEN
+                PERFORM pg_notify('cache_invalidate', json_build_object(
+                    'table', 'configuration',
+                    'id', 'config'
+                )::text);
+
+            ELSIF TG_TABLE_NAME = 'rbx_cookies' THEN
+                PERFORM pg_notify('cache_invalidate', json_build_object(
+                    'table', 'rbx_cookies',
+                    'id', 'rbx_cookies'
+                )::text);
+            END IF;
+
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS guilds_cache_trigger ON guilds;
+        CREATE TRIGGER guilds_cache_trigger
+        AFTER INSERT OR UPDATE OR DELETE ON guilds
+        FOR EACH ROW EXECUTE FUNCTION notify_cache_invalidate();
+
+        DROP TRIGGER IF EXISTS members_cache_trigger ON members;
+        CREATE TRIGGER members_cache_trigger
+        AFTER INSERT OR UPDATE OR DELETE ON members
+        FOR EACH ROW EXECUTE FUNCTION notify_cache_invalidate();
+
+        DROP TRIGGER IF EXISTS users_cache_trigger ON users;
+        CREATE TRIGGER users_cache_trigger
+        AFTER INSERT OR UPDATE OR DELETE ON users
+        FOR EACH ROW EXECUTE FUNCTION notify_cache_invalidate();
+
+        DROP TRIGGER IF EXISTS configuration_cache_trigger ON configuration;
+        CREATE TRIGGER configuration_cache_trigger
+        AFTER INSERT OR UPDATE OR DELETE ON configuration
+        FOR EACH ROW EXECUTE FUNCTION notify_cache_invalidate();
+
+        DROP TRIGGER IF EXISTS rbx_cookies_cache_trigger ON rbx_cookies;
+        CREATE TRIGGER rbx_cookies_cache_trigger
+        AFTER INSERT OR UPDATE OR DELETE ON rbx_cookies
+        FOR EACH ROW EXECUTE FUNCTION notify_cache_invalidate();
+        """,
+    ),
+    (
+        3,
+        "role snapshots",
+        """
+        CREATE TABLE IF NOT EXISTS role_snapshots (
+            id BIGSERIAL PRIMARY KEY,
+            guild_id BIGINT NOT NULL,
+            member_id BIGINT NOT NULL,
+            role_ids BIGINT[] NOT NULL,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+
+        CREATE INDEX IF NOT EXISTS role_snapshots_member_idx
+            ON role_snapshots (guild_id, member_id, created_at DESC);
+
+        ALTER TABLE role_snapshots DISABLE ROW LEVEL SECURITY;
+        """,
+    ),
+    (
+        4,
+        "members by member_id",
+        """
+        -- deep_delete_member_data filters on member_id alone, which the
+        -- (guild_id, member_id) primary key can't serve.
+        CREATE INDEX IF NOT EXISTS members_member_id_idx ON members (member_id);
+        """,
+    ),
+    (
+        5,
+        "role snapshots by age",
+        """
+        -- The retention sweep deletes by created_at across every guild.
+        CREATE INDEX IF NOT EXISTS role_snapshots_created_idx
+            ON role_snapshots (created_at);
+        """,
+    ),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+async def current_version(conn: asyncpg.Connection) -> int:
+    try:
+        return await conn.fetchval("SELECT max(version) FROM schema_version") or 0
+    except asyncpg.UndefinedTableError:
+        return 0
+
+
+async def migrate(pool: asyncpg.Pool) -> List[int]:
+    async with pool.acquire() as conn:
+        # Up-to-date databases only pay for this one query.
+        if await current_version(conn) >= LATEST_VERSION:
+            return []
+
+        applied = []
+        # One transaction with a transaction-level lock, so it also holds up
+        # behind a transaction-mode pooler; a failed migration rolls back whole.
+        async with conn.transaction():
+            await conn.execute("SELECT pg_advisory_xact_lock($1)", MIGRATION_LOCK_ID)
+            await conn.execute("SET LOCAL bot.is_updating = 'true';")
+            await conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                );
+                """
+            )
+
+            # Another instance may have migrated while this one waited.
+            current = await current_version(conn)
+            for version, name, sql in MIGRATIONS:
+                if version <= current:
+                    continue
+
+                await conn.execute(sql)
+                await conn.execute(
+                    "INSERT INTO schema_version (version, name) VALUES ($1, $2)",
+                    version,
+                    name,
+                )
+                applied.append(version)
+                log.info(f"Applied migration {version}: {name}")
+
+        return applied
@@ -1,140 +1,164 @@
 import discord
 from discord.ext import commands
-from typing import Mapping, Dict, Any, Union
+from enum import IntEnum
+from typing import Mapping, Dict, Any, Iterable, List, Union
 
 from utils import exceptions, helpers
-from utils.messages import Embeds
 
 
-async def higher_permissions(
-    should_be_higher: discord.Member,
-    should_be_lower: discord.Member,
-    action: str = "do that to",
+class Verdict(IntEnum):
+    OK = 0
+    SELF = 1
+    BOT = 2
+    OWNER = 3
+    ABOVE_ACTOR = 4
+    EQUAL_ACTOR = 5
+    ABOVE_BOT = 6
+    EQUAL_BOT = 7
+    EVERYONE_ROLE = 8
+    ROLE_ABOVE_BOT = 9
+    ROLE_EQUAL_BOT = 10
+    ROLE_ABOVE_ACTOR = 11
+    ROLE_EQUAL_ACTOR = 12
+
+
+VERDICT_MESSAGES: Dict[Verdict, str] = {
+    Verdict.SELF: "You **can't {action}** yourself.",
+    Verdict.BOT: "You **can't {action}** me. Try doing it without my own commands.",
+    Verdict.OWNER: "You **can't {action}** the server owner.",
+    Verdict.ABOVE_ACTOR: "You **can't {action}** someone who is **higher than you**.",
+    Verdict.EQUAL_ACTOR: "You **can't {action}** someone who is **equal to you**.",
+    Verdict.ABOVE_BOT: "I **can't {action}** someone who is **higher than me**.",
+    Verdict.EQUAL_BOT: "I **can't {action}** someone who is **equal to me**.",
+    Verdict.EVERYONE_ROLE: "You **can't {action}** the `@everyone` role.",
+    Verdict.ROLE_ABOVE_BOT: "I **can't {action}** a role that is **higher than me**.",
+    Verdict.ROLE_EQUAL_BOT: "I **can't {action}** a role that is **equal to my highest role**.",
+    Verdict.ROLE_ABOVE_ACTOR: "You **can't {action}** a role that is **higher than you**.",
+    Verdict.ROLE_EQUAL_ACTOR: "You **can't {action}** a role that is **equal to your highest role**.",
+}
+
+
+def verdict_message(verdict: Verdict, action: str = "do that to") -> str:
+    return VERDICT_MESSAGES[verdict].format(action=action)
+
+
+def member_verdicts(
+    actor: discord.Member,
+    targets: Iterable[Union[discord.Member, discord.User]],
     can_inflict_self: bool = False,
     can_inflict_bot: bool = False,
     can_inflict_owner: bool = False,
-):
-    if should_be_higher.id == should_be_higher.guild.owner_id:
-        if should_be_lower.id == should_be_higher.guild.me.id and not can_inflict_bot:
-            raise exceptions.HierarchyCheckError(
-                Embeds.warning(
-                    author=should_be_higher,
-                    description=f"You **can't {action}** me. Try doing it without my own commands.",
-                )
-            )
-        return
-
-    if should_be_lower.id == should_be_higher.id and not can_inflict_self:
-        raise exceptions.HierarchyCheckError(
-            Embeds.warning(
-                author=should_be_higher,
-                description=f"You **can't {action}** yourself.",
-            )
-        )
-
-    if should_be_lower.id == should_be_higher.guild.me.id and not can_inflict_bot:
-        raise exceptions.HierarchyCheckError(
-            Embeds.warning(
-                author=should_be_higher,
-                description=f"You **can't {action}** me. Try doing it without my own commands.",
-            )
-        )
-
-    if (
-        should_be_lower.id == should_be_lower.guild.owner_id
-        and not can_inflict_owner
-        and not should_be_higher.id == should_be_lower.id
-    ):
-        raise exceptions.HierarchyCheckError(
-            Embeds.warning(
-                author=should_be_higher,
-                description=f"You **can't {action}** the server owner.",
-            )
-        )
+) -> List[Verdict]:
+    guild = actor.guild
+    owner_id = guild.owner_id
+    bot_id = guild.me.id
+    actor_is_owner = actor.id == owner_id
+    actor_position = actor.top_role.position
+    bot_position = guild.me.top_role.position
+
+    verdicts = []
+    for target in targets:
+        if actor_is_owner:
+            if target.id == bot_id and not can_inflict_bot:
+                verdicts.append(Verdict.BOT)
+            else:
+                verdicts.append(Verdict.OK)
+            continue
+
+        if target.id == actor.id and not can_inflict_self:
+            verdicts.append(Verdict.SELF)
+        elif target.id == bot_id and not can_inflict_bot:
+            verdicts.append(Verdict.BOT)
+        elif target.id == owner_id and not can_inflict_owner and target.id != actor.id:
+            verdicts.append(Verdict.OWNER)
+        elif not isinstance(target, discord.Member):
+            verdicts.append(Verdict.OK)
+        elif actor_position < target.top_role.position:
+            verdicts.append(Verdict.ABOVE_ACTOR)
+        elif actor_position == target.top_role.position:
+            verdicts.append(Verdict.EQUAL_ACTOR)
+        elif bot_position < target.top_role.position:
+            verdicts.append(Verdict.ABOVE_BOT)
+        elif bot_position == target.top_role.position:
+            verdicts.append(Verdict.EQUAL_BOT)
+        else:
+            verdicts.append(Verdict.OK)
 
-    if not isinstance(should_be_lower, discord.Member):
-        return
+    return verdicts
 
-    if should_be_higher.top_role.position < should_be_lower.top_role.position:
-        raise exceptions.HierarchyCheckError(
-            Embeds.warning(
-                author=should_be_higher,
-                description=f"You **can't {action}** someone who is **higher than you**.",
-            )
-        )
-    elif should_be_higher.top_role.position == should_be_lower.top_role.position:
-        raise exceptions.HierarchyCheckError(
-            Embeds.warning(
-                author=should_be_higher,
-                description=f"You **can't {action}** someone who is **equal to you**.",
-            )
-        )
 
-    bot_member = should_be_higher.guild.me
-    if bot_member.top_role.position < should_be_lower.top_role.position:
-        raise exceptions.HierarchyCheckError(
-            Embeds.warning(
-                author=should_be_higher,
-                description=f"I **can't {action}** someone who is **higher than me**.",
-            )
-        )
-    elif bot_member.top_role.position == should_be_lower.top_role.position:
-        raise exceptions.HierarchyCheckError(
-            Embeds.warning(
-                author=should_be_higher,
-                description=f"I **can't {action}** someone who is **equal to me**.",
-            )
-        )
+def member_verdict(
+    actor: discord.Member, target: Union[discord.Member, discord.User], **flags
+) -> Verdict:
+    return member_verdicts(actor, (target,), **flags)[0]
 
 
-async def higher_role_permissions(
+def role_verdict(
     actor: discord.Member,
     target_role: discord.Role,
-    action: str = "do that to",
     can_affect_bot_role: bool = False,
     can_affect_everyone_role: bool = False,
-):
-    guild = actor.guild
-    bot_member = guild.me
+) -> Verdict:
+    bot_position = actor.guild.me.top_role.position
 
     if target_role.is_default() and not can_affect_everyone_role:
-        raise exceptions.HierarchyCheckError(
-            Embeds.warning(
-                author=actor,
-                description=f"You **can't {action}** the `@everyone` role.",
-            )
-        )
+        return Verdict.EVERYONE_ROLE
 
-    if bot_member.top_role.position <= target_role.position and not can_affect_bot_role:
-        if bot_member.top_role.position < target_role.position:
-            raise exceptions.HierarchyCheckError(
-                Embeds.warning(
-                    author=actor,
-                    description=f"I **can't {action}** a role that is **higher than me**.",
-                )
-            )
-        else:
-            raise exceptions.HierarchyCheckError(
-                Embeds.warning(
-                    author=actor,
-                    description=f"I **can't {action}** a role that is **equal to my highest role**.",
-                )
-            )
+    if not can_affect_bot_role:
+        if bot_position < target_role.position:
+            return Verdict.ROLE_ABOVE_BOT
+        if bot_position == target_role.position:
+            return Verdict.ROLE_EQUAL_BOT
 
     if actor.top_role.position < target_role.position:
+        return Verdict.ROLE_ABOVE_ACTOR
+    if actor.top_role.position == target_role.position:
+        return Verdict.ROLE_EQUAL_ACTOR
+
+    return Verdict.OK
+
+
+async def higher_permissions(
+    should_be_higher: discord.Member,
+    should_be_lower: discord.Member,
+    action: str = "do that to",
+    can_inflict_self: bool = False,
+    can_inflict_bot: bool = False,
+    can_inflict_owner: bool = False,
+):
+    verdict = member_verdict(
+        should_be_higher,
+        should_be_lower,
+        can_inflict_self=can_inflict_self,
+        can_inflict_bot=can_inflict_bot,
+        can_inflict_owner=can_inflict_owner,
+    )
+    if verdict:
         raise exceptions.HierarchyCheckError(
-            Embeds.warning(
-                author=actor,
-                description=f"You **can't {action}** a role that is **higher than you**.",
-            )
+            author=should_be_higher,
+            description=verdict_message(verdict, action),
+            verdict=verdict,
         )
 
-    if actor.top_role.position == target_role.position:
+
+async def higher_role_permissions(
+    actor: discord.Member,
+    target_role: discord.Role,
+    action: str = "do that to",
+    can_affect_bot_role: bool = False,
+    can_affect_everyone_role: bool = False,
+):
+    verdict = role_verdict(
+        actor,
+        target_role,
+        can_affect_bot_role=can_affect_bot_role,
+        can_affect_everyone_role=can_affect_everyone_role,
+    )
+    if verdict:
         raise exceptions.HierarchyCheckError(
-            Embeds.warning(
-                author=actor,
-                description=f"You **can't {action}** a role that is **equal to your highest role**.",
-            )
+            author=actor,
+            description=verdict_message(verdict, action),
+            verdict=verdict,
         )
 
     return True
@@ -0,0 +1,91 @@
+import discord, asyncio, logging
+from datetime import timedelta
+from discord.utils import utcnow
+from typing import Callable, List, Optional
+
+log = logging.getLogger("Purge")
+
+BULK_DELETE_SIZE = 100
+# Discord rejects bulk deletes of messages older than 14 days; keep a margin.
+BULK_DELETE_MAX_AGE = timedelta(days=14) - timedelta(minutes=5)
+
+
+class PurgeResult:
+    __slots__ = ("scanned", "deleted", "failed", "stopped_by")
+
+    def __init__(self):
+        self.scanned = 0
+        self.deleted = 0
+        self.failed = 0
+        self.stopped_by = "history"
+
+
+async def delete_chunk(
+    channel: discord.abc.Messageable, messages: List[discord.Message], reason: str
+) -> int:
+    await channel.delete_messages(messages, reason=reason)
+    return len(messages)
+
+
+async def purge_channel(
+    channel: discord.TextChannel,
+    amount: int,
+    check: Callable[[discord.Message], bool],
+    scan_limit: int,
+    reason: Optional[str] = None,
+    before: Optional[discord.abc.Snowflake] = None,
+) -> PurgeResult:
+    result = PurgeResult()
+    cutoff = utcnow() - BULK_DELETE_MAX_AGE
+    chunk: List[discord.Message] = []
+    tasks: List[asyncio.Task] = []
+    sizes: List[int] = []
+    matched = 0
+
+    # Chunks are deleted in the background while history keeps paging.
+    async for message in channel.history(limit=scan_limit, before=before):
+        result.scanned += 1
+
+        if message.created_at < cutoff:
+            result.stopped_by = "age"
+            break
+
+        if not check(message):
+            continue
+
+        chunk.append(message)
+        matched += 1
+
+        if len(chunk) == BULK_DELETE_SIZE:
+            tasks.append(asyncio.create_task(delete_chunk(channel, chunk, reason)))
+            sizes.append(len(chunk))
+            chunk = []
+
+        if matched >= amount:
+            result.stopped_by = "amount"
+            break
+    else:
+        if result.scanned >= scan_limit:
+            result.stopped_by = "budget"
+
+    if chunk:
+        tasks.append(asyncio.create_task(delete_chunk(channel, chunk, reason)))
+        sizes.append(len(chunk))
+
+    forbidden = None
+    outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+    for size, outcome in zip(sizes, outcomes):
+        if isinstance(outcome, int):
+            result.deleted += outcome
+            continue
+
+        result.failed += size
+        if isinstance(outcome, discord.Forbidden):
+            forbidden = outcome
+        else:
+            log.debug(f"Failed to delete {size} message(s) in {channel.id}: {outcome}")
+
+    if forbidden and not result.deleted:
+        raise forbidden
+
+    return result
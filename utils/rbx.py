@@ -0,0 +1,295 @@
+import asyncio, hashlib, logging, time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+)
+
+from utils import helpers
+from utils.cache import MISSING
+
+# roblox pulls in httpx and its models; it is imported on first use.
+if TYPE_CHECKING:
+    import roblox
+
+log = logging.getLogger("Roblox")
+
+RATE_LIMIT_COOLDOWN = 60.0
+UNAUTHORIZED_COOLDOWN = 600.0
+# Weight of the newest result in a cookie's moving error rate.
+ERROR_DECAY = 0.2
+# How long an unknown username is remembered.
+MISSING_TTL = 300
+
+
+class NoCookiesAvailable(Exception):
+    pass
+
+
+class CookieState:
+    __slots__ = (
+        "cookie",
+        "in_flight",
+        "requests",
+        "errors",
+        "error_rate",
+        "cooldown_until",
+        "last_error",
+    )
+
+    def __init__(self, cookie: str):
+        self.cookie = cookie
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.error_rate = 0.0
+        self.cooldown_until = 0.0
+        self.last_error: Optional[str] = None
+
+    def cooling_down(self, now: float) -> bool:
+        return self.cooldown_until > now
+
+
+class CookiePool:
+    def __init__(self):
+        self.states: Dict[str, CookieState] = {}
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def load(self, cookies: Iterable[str]) -> List[str]:
+        cookies = list(dict.fromkeys(c for c in cookies if c))
+        removed = [c for c in self.states if c not in cookies]
+
+        self.states = {c: self.states.get(c) or CookieState(c) for c in cookies}
+        return removed
+
+    def acquire(self, exclude: Iterable[str] = ()) -> CookieState:
+        now = time.monotonic()
+        healthy = [
+            state
+            for state in self.states.values()
+            if not state.cooling_down(now) and state.cookie not in exclude
+        ]
+        if not healthy:
+            raise NoCookiesAvailable()
+
+        state = min(healthy, key=lambda s: (s.in_flight, s.error_rate))
+        state.in_flight += 1
+        return state
+
+    def release(self, state: CookieState, error: Optional[Exception] = None):
+        import roblox
+
+        state.in_flight = max(0, state.in_flight - 1)
+        state.requests += 1
+
+        failed = error is not None and not isinstance(
+            error, (roblox.ItemNotFound, roblox.NotFound)
+        )
+        state.error_rate = state.error_rate * (1 - ERROR_DECAY) + (
+            ERROR_DECAY if failed else 0.0
+        )
+        if not failed:
+            return
+
+        state.errors += 1
+        state.last_error = type(error).__name__
+
+        if isinstance(error, roblox.TooManyRequests):
+            state.cooldown_until = time.monotonic() + RATE_LIMIT_COOLDOWN
+        elif isinstance(error, roblox.Unauthorized):
+            state.cooldown_until = time.monotonic() + UNAUTHORIZED_COOLDOWN
+
+    def snapshot(self) -> List[tuple]:
+        now = time.monotonic()
+        return [
+            (
+                hashlib.sha1(state.cookie.encode()).hexdigest()[:8],
+                state.in_flight,
+                state.requests,
+                state.errors,
+                state.error_rate,
+                max(0.0, state.cooldown_until - now),
+                state.last_error,
+            )
+            for state in self.states.values()
+        ]
+
+
+class RobloxService:
+    def __init__(self, dbf, cache, attempts: int = 2):
+        self.dbf = dbf
+        self.cache = cache
+        self.attempts = attempts
+        self.pool = CookiePool()
+        self.clients: Dict[str, "roblox.Client"] = {}
+        self.loaded = False
+        self._load_lock = asyncio.Lock()
+        # normalized username -> lookup shared by concurrent callers
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        dbf.add_invalidation_hook("rbx_cookies", self.on_cookies_invalidate)
+
+    def client_for(self, cookie: str) -> "roblox.Client":
+        import roblox
+
+        client = self.clients.get(cookie)
+        if client is None:
+            client = self.clients[cookie] = roblox.Client(token=cookie)
+        return client
+
+    async def reload(self):
+        data = await self.dbf.get_roblox_cookies()
+        for cookie in self.pool.load(data.get("Cookies", [])):
+            self.clients.pop(cookie, None)
+        self.loaded = True
+        log.info(f"Loaded {len(self.pool)} Roblox cookie(s)")
+
+    async def ensure_loaded(self):
+        if self.loaded:
+            return
+        async with self._load_lock:
+            if not self.loaded:
+                await self.reload()
+
+    async def on_cookies_invalidate(self, data: dict):
+        await self.reload()
+
+    async def with_client(self, func: Callable[["roblox.Client"], Awaitable[Any]]):
+        import roblox
+
+        await self.ensure_loaded()
+
+        tried = []
+        for attempt in range(self.attempts):
+            state = self.pool.acquire(exclude=tried)
+            tried.append(state.cookie)
+
+            try:
+                result = await func(self.client_for(state.cookie))
+            except roblox.TooManyRequests as e:
+                self.pool.release(state, e)
+                if attempt + 1 >= self.attempts or len(tried) >= len(self.pool):
+                    raise
+                continue
+            except Exception as e:
+                self.pool.release(state, e)
+                raise
+
+            self.pool.release(state)
+            return result
+
+    async def get_profile(self, username: str) -> dict:
+        key = username.strip().lower()
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._get_profile(key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        return await asyncio.shield(task)
+
+    async def _get_profile(self, key: str) -> dict:
+        import roblox
+
+        user_id = await self.cache.roblox_ids.get(key)
+        if user_id is MISSING:
+            raise roblox.UserNotFound("Invalid username.")
+
+        details = counts = thumbnail = None
+        if user_id is not None:
+            details = await self.cache.roblox_profiles.get(str(user_id))
+            counts = await self.cache.roblox_counts.get(str(user_id))
+            thumbnail = await self.cache.roblox_thumbnails.get(str(user_id))
+
+        if details is None or counts is None or thumbnail is None:
+            user_id, details, counts, thumbnail = await self.with_client(
+                lambda client: self._fetch_missing(
+                    client, key, user_id, details, counts, thumbnail
+                )
+            )
+
+        profile = {**details, **counts}
+        if thumbnail["url"]:
+            profile["thumbnail"] = thumbnail["url"]
+            profile["colour"] = thumbnail["colour"]
+        return profile
+
+    async def _fetch_missing(
+        self,
+        client: "roblox.Client",
+        key: str,
+        user_id: Optional[int],
+        details: Optional[dict],
+        counts: Optional[dict],
+        thumbnail: Optional[dict],
+    ) -> tuple:
+        import roblox
+
+        if user_id is None:
+            try:
+                requested = await client.get_user_by_username(key, expand=False)
+            except roblox.UserNotFound:
+                await self.cache.roblox_ids.set(key, MISSING, ttl=MISSING_TTL)
+                raise
+            user_id = requested.id
+            await self.cache.roblox_ids.set(key, user_id)
+
+        base = client.get_base_user(user_id)
+        jobs = {}
+
+        if details is None:
+            jobs["details"] = client.get_user(user_id)
+        if counts is None:
+            jobs["friends"] = base.get_friend_count()
+            jobs["followers"] = base.get_follower_count()
+            jobs["following"] = base.get_following_count()
+        if thumbnail is None:
+            jobs["thumbnail"] = client.thumbnails.get_user_avatar_thumbnails(
+                users=[base],
+                type=roblox.AvatarThumbnailType.full_body,
+                size=(420, 420),
+            )
+
+        results = dict(zip(jobs, await asyncio.gather(*jobs.values())))
+
+        if details is None:
+            user = results["details"]
+            details = {
+                "id": user.id,
+                "name": user.name,
+                "display_name": user.display_name,
+                "description": user.description,
+                "is_banned": user.is_banned,
+                "created_timestamp": int(user.created.timestamp()),
+            }
+            await self.cache.roblox_profiles.set(str(user_id), details)
+
+        if counts is None:
+            counts = {
+                "friends_count": results["friends"],
+                "follower_count": results["followers"],
+                "following_count": results["following"],
+            }
+            await self.cache.roblox_counts.set(str(user_id), counts)
+
+        if thumbnail is None:
+            thumbnails = results["thumbnail"]
+            url = thumbnails[0].image_url if thumbnails else None
+            colour = None
+            if url:
+                try:
+                    colour = await helpers.image_primary_colour(url=url)
+                except Exception as e:
+                    log.debug(f"Couldn't get the colour of {url}: {e}")
+            thumbnail = {"url": url, "colour": colour}
+            await self.cache.roblox_thumbnails.set(str(user_id), thumbnail)
+
+        return user_id, details, counts, thumbnail
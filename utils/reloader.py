@@ -0,0 +1,219 @@
+import ast, hashlib, importlib, importlib.util, logging, os, sys, time
+from typing import Dict, List, Optional, Set, Tuple
+
+log = logging.getLogger("Cogs")
+
+PACKAGES = ("cogs", "utils")
+
+
+class FileState:
+    __slots__ = ("mtime", "digest", "imports")
+
+    def __init__(self, mtime: int, digest: str, imports: Set[str]):
+        self.mtime = mtime
+        self.digest = digest
+        self.imports = imports
+
+
+class ReloadResult:
+    __slots__ = ("changed", "timings", "loaded", "unloaded", "failed", "restart")
+
+    def __init__(self):
+        self.changed: List[str] = []
+        self.timings: Dict[str, float] = {}
+        self.loaded: List[str] = []
+        self.unloaded: List[str] = []
+        self.failed: Dict[str, str] = {}
+        self.restart: List[str] = []
+
+
+def parse_imports(module: str, source: bytes) -> Set[str]:
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        # The reload itself will report the error.
+        return set()
+
+    package = module.rpartition(".")[0]
+    imports = set()
+
+    # ast.walk also picks up imports deferred into function bodies.
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                base = importlib.util.resolve_name("." * node.level + base, package)
+            imports.add(base)
+            imports.update(f"{base}.{alias.name}" for alias in node.names)
+
+    return {name for name in imports if name.split(".")[0] in PACKAGES}
+
+
+class Reloader:
+    """Reloads only the cogs and utils whose source changed, plus everything
+    that imports them.
+
+    Modules main.py imports directly are never reloaded: the bot keeps
+    instances, caches and sentinels from them for its whole lifetime, so a
+    change there is reported as needing a restart instead.
+    """
+
+    def __init__(self, bot, root: str = "."):
+        self.bot = bot
+        self.root = root
+        self.files: Dict[str, FileState] = {}
+        self.pinned: Set[str] = set()
+
+    def discover(self) -> Dict[str, str]:
+        modules = {}
+        for package in PACKAGES:
+            for root, dirs, files in os.walk(os.path.join(self.root, package)):
+                dirs[:] = [d for d in dirs if d != "__pycache__"]
+                for file in files:
+                    if not file.endswith(".py"):
+                        continue
+                    path = os.path.join(root, file)
+                    module = os.path.relpath(path, self.root).replace(os.sep, ".")[:-3]
+                    if module.endswith(".__init__"):
+                        module = module[: -len(".__init__")]
+                    modules[module] = path
+        return modules
+
+    def read(
+        self, module: str, path: str, previous: Optional[FileState]
+    ) -> Optional[FileState]:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        # mtime is the cheap check; the hash ignores saves that changed nothing.
+        if previous is not None and previous.mtime == mtime:
+            return previous
+
+        with open(path, "rb") as f:
+            source = f.read()
+
+        digest = hashlib.sha1(source).hexdigest()
+        if previous is not None and previous.digest == digest:
+            previous.mtime = mtime
+            return previous
+
+        return FileState(mtime, digest, parse_imports(module, source))
+
+    def snapshot(self):
+        self.files = {}
+        for module, path in self.discover().items():
+            state = self.read(module, path, None)
+            if state is not None:
+                self.files[module] = state
+
+        main_path = os.path.join(self.root, "main.py")
+        if os.path.exists(main_path):
+            with open(main_path, "rb") as f:
+                self.pinned = parse_imports("main", f.read())
+
+    def scan(self) -> Tuple[Dict[str, FileState], Set[str], Set[str]]:
+        states, changed = {}, set()
+        for module, path in self.discover().items():
+            previous = self.files.get(module)
+            state = self.read(module, path, previous)
+            if state is None:
+                continue
+
+            states[module] = state
+            if state is not previous:
+                changed.add(module)
+
+        removed = set(self.files) - set(states)
+        return states, changed, removed
+
+    @staticmethod
+    def dependents(states: Dict[str, FileState], changed: Set[str]) -> Set[str]:
+        importers: Dict[str, Set[str]] = {}
+        for module, state in states.items():
+            for name in state.imports:
+                importers.setdefault(name, set()).add(module)
+
+        affected = set(changed)
+        stack = list(changed)
+        while stack:
+            for module in importers.get(stack.pop(), ()):
+                if module not in affected:
+                    affected.add(module)
+                    stack.append(module)
+        return affected
+
+    @staticmethod
+    def order(modules: Set[str], states: Dict[str, FileState]) -> List[str]:
+        # Dependencies first, so a cog re-imports already reloaded utils.
+        ordered, seen = [], set()
+
+        def visit(module: str):
+            if module in seen:
+                return
+            seen.add(module)
+            for name in sorted(states[module].imports):
+                if name in modules:
+                    visit(name)
+            ordered.append(module)
+
+        for module in sorted(modules):
+            visit(module)
+        return ordered
+
+    async def reload(self, force: bool = False) -> ReloadResult:
+        result = ReloadResult()
+        states, changed, removed = self.scan()
+        extensions = set(self.bot.extensions)
+
+        # Cogs on disk that aren't loaded: new files, or ones that failed before.
+        changed |= {m for m in states if m.startswith("cogs.") and m not in extensions}
+        if force:
+            changed |= extensions
+
+        result.restart = sorted(changed & self.pinned)
+        changed -= self.pinned
+        result.changed = sorted(changed)
+
+        for module in sorted(removed & extensions):
+            try:
+                await self.bot.unload_extension(module)
+                result.unloaded.append(module)
+            except Exception as err:
+                result.failed[module] = str(err)
+
+        affected = self.dependents(states, changed) - self.pinned
+        for module in self.order(affected, states):
+            start = time.perf_counter()
+            try:
+                if module in extensions:
+                    await self.bot.reload_extension(module)
+                elif module.startswith("cogs."):
+                    await self.bot.load_extension(module)
+                    result.loaded.append(module)
+                elif module in sys.modules:
+                    importlib.reload(sys.modules[module])
+                else:
+                    continue
+            except Exception as err:
+                result.failed[module] = str(err)
+                log.error(f"Failed to reload {module}: {err}")
+                continue
+            finally:
+                elapsed = time.perf_counter() - start
+
+            result.timings[module] = elapsed
+            log.info(f"Reloaded {module} in {elapsed * 1000:.0f}ms")
+
+        # Failed and pinned modules keep their old fingerprint, so the next
+        # reload retries or reports them again.
+        for module, state in states.items():
+            if module not in result.failed and module not in result.restart:
+                self.files[module] = state
+        for module in removed:
+            self.files.pop(module, None)
+
+        return result
@@ -0,0 +1,124 @@
+import discord, asyncio, logging
+from typing import Dict, Iterable, Optional, Tuple
+
+log = logging.getLogger("Roles")
+
+MAX_REASON_LENGTH = 512
+
+
+class PendingRoleEdit:
+    __slots__ = ("member", "add", "remove", "reasons", "future")
+
+    def __init__(self, member: discord.Member, future: asyncio.Future):
+        self.member = member
+        self.add: Dict[int, discord.abc.Snowflake] = {}
+        self.remove: set[int] = set()
+        self.reasons: list[str] = []
+        self.future = future
+
+
+class RoleEditQueue:
+    def __init__(self, delay: float = 0.5):
+        self.delay = delay
+        self._pending: Dict[Tuple[int, int], PendingRoleEdit] = {}
+        self._tasks: set[asyncio.Task] = set()
+        # Latest flush per member; the next one waits for it so edits never overlap.
+        self._inflight: Dict[Tuple[int, int], asyncio.Task] = {}
+
+    def queue(
+        self,
+        member: discord.Member,
+        add: Iterable[discord.abc.Snowflake] = (),
+        remove: Iterable[discord.abc.Snowflake] = (),
+        reason: Optional[str] = None,
+    ) -> asyncio.Future:
+        key = (member.guild.id, member.id)
+        pending = self._pending.get(key)
+
+        if pending is None:
+            loop = asyncio.get_running_loop()
+            pending = PendingRoleEdit(member, loop.create_future())
+            self._pending[key] = pending
+            loop.call_later(self.delay, self._start_flush, key)
+
+        pending.member = member
+
+        for role in add:
+            pending.remove.discard(role.id)
+            pending.add[role.id] = role
+
+        for role in remove:
+            pending.add.pop(role.id, None)
+            pending.remove.add(role.id)
+
+        if reason and reason not in pending.reasons:
+            pending.reasons.append(reason)
+
+        return pending.future
+
+    async def edit(
+        self,
+        member: discord.Member,
+        add: Iterable[discord.abc.Snowflake] = (),
+        remove: Iterable[discord.abc.Snowflake] = (),
+        reason: Optional[str] = None,
+    ) -> bool:
+        future = self.queue(member, add=add, remove=remove, reason=reason)
+        return await asyncio.shield(future)
+
+    def _start_flush(self, key: Tuple[int, int]):
+        task = asyncio.create_task(self._flush(key, self._inflight.get(key)))
+        self._inflight[key] = task
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        task.add_done_callback(lambda t: self._forget_flush(key, t))
+
+    def _forget_flush(self, key: Tuple[int, int], task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def _flush(
+        self, key: Tuple[int, int], previous: Optional[asyncio.Task] = None
+    ) -> Optional[discord.Member]:
+        edited = None
+        if previous is not None:
+            # The gateway cache lags behind our own PATCH, so build on the
+            # member the previous edit returned instead.
+            try:
+                edited = await previous
+            except Exception:
+                edited = None
+
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return edited
+
+        member = pending.member
+        member = edited or member.guild.get_member(member.id) or member
+        default_role_id = member.guild.id
+
+        current = {r.id for r in member.roles if r.id != default_role_id}
+        updated = (current - pending.remove) | set(pending.add)
+
+        if updated == current:
+            if not pending.future.done():
+                pending.future.set_result(False)
+            return edited
+
+        reason = " / ".join(pending.reasons)[:MAX_REASON_LENGTH] or None
+
+        try:
+            edited = await member.edit(
+                roles=[discord.Object(id=rid) for rid in updated], reason=reason
+            )
+        except Exception as e:
+            if not pending.future.done():
+                pending.future.set_exception(e)
+                # Nobody may be awaiting a queued edit; mark it as retrieved.
+                pending.future.exception()
+            log.debug(f"Failed to edit roles for {member}: {e}")
+            return None
+
+        if not pending.future.done():
+            pending.future.set_result(True)
+        return edited
@@ -0,0 +1,168 @@
+import asyncio, logging, time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+log = logging.getLogger("Snapshots")
+
+
+class RoleSnapshotStore:
+    def __init__(
+        self,
+        db,
+        hot_size: int = 5000,
+        batch_size: int = 500,
+        flush_interval: float = 5.0,
+        retention: timedelta = timedelta(days=30),
+    ):
+        self.db = db
+        self.hot_size = hot_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention = retention
+
+        self.hot: OrderedDict[Tuple[int, int], Tuple[int, ...]] = OrderedDict()
+        # role_id -> hot keys holding that role, so role deletes skip a full scan
+        self.by_role: Dict[int, Set[Tuple[int, int]]] = {}
+        self._buffer: List[tuple] = []
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        # The loop only holds weak references to tasks; keep the batch flush alive.
+        self._pending_flush: Optional[asyncio.Task] = None
+        self._last_prune = 0.0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    def record(self, guild_id: int, member_id: int, role_ids: Iterable[int]):
+        key = (guild_id, member_id)
+        role_ids = tuple(role_ids)
+
+        if not role_ids or self.hot.get(key) == role_ids:
+            return
+
+        self._set_hot(key, role_ids)
+        self._buffer.append(
+            (guild_id, member_id, list(role_ids), datetime.now(timezone.utc))
+        )
+
+        if len(self._buffer) >= self.batch_size and (
+            self._pending_flush is None or self._pending_flush.done()
+        ):
+            self._pending_flush = asyncio.create_task(self.flush())
+
+    async def get(self, guild_id: int, member_id: int) -> Optional[List[int]]:
+        key = (guild_id, member_id)
+        role_ids = self.hot.get(key)
+        if role_ids is not None:
+            self.hot.move_to_end(key)
+            return list(role_ids)
+
+        row = await self.db.fetchrow(
+            """
+            SELECT role_ids FROM role_snapshots
+            WHERE guild_id=$1 AND member_id=$2
+            ORDER BY created_at DESC
+            LIMIT 1
+            """,
+            guild_id,
+            member_id,
+        )
+        if not row:
+            return None
+
+        self._set_hot(key, tuple(row["role_ids"]))
+        return list(row["role_ids"])
+
+    async def delete(self, guild_id: int, member_id: int):
+        self._pop_hot((guild_id, member_id))
+
+        async with self._flush_lock:
+            self._buffer = [
+                entry
+                for entry in self._buffer
+                if entry[0] != guild_id or entry[1] != member_id
+            ]
+            await self.db.execute(
+                "DELETE FROM role_snapshots WHERE guild_id=$1 AND member_id=$2",
+                guild_id,
+                member_id,
+            )
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._buffer:
+                return
+
+            records, self._buffer = self._buffer, []
+            try:
+                await self.db.executemany(
+                    "INSERT INTO role_snapshots (guild_id, member_id, role_ids, created_at) VALUES ($1, $2, $3, $4)",
+                    records,
+                )
+            except Exception as e:
+                log.error(f"Failed to write {len(records)} role snapshot(s): {e}")
+                self._buffer = (records + self._buffer)[-self.batch_size * 20 :]
+
+    async def prune(self) -> int:
+        status = await self.db.execute(
+            "DELETE FROM role_snapshots WHERE created_at < $1",
+            datetime.now(timezone.utc) - self.retention,
+        )
+        return int(status.split()[-1])
+
+    def discard_role(self, role_id: int) -> int:
+        keys = self.by_role.pop(role_id, set())
+
+        for key in keys:
+            role_ids = tuple(rid for rid in self.hot[key] if rid != role_id)
+            if role_ids:
+                self.hot[key] = role_ids
+            else:
+                self._pop_hot(key)
+
+        return len(keys)
+
+    def _set_hot(self, key: Tuple[int, int], role_ids: Tuple[int, ...]):
+        self._pop_hot(key)
+        self.hot[key] = role_ids
+
+        for role_id in role_ids:
+            self.by_role.setdefault(role_id, set()).add(key)
+
+        while len(self.hot) > self.hot_size:
+            self._pop_hot(next(iter(self.hot)))
+
+    def _pop_hot(self, key: Tuple[int, int]):
+        role_ids = self.hot.pop(key, None)
+        if not role_ids:
+            return
+
+        for role_id in role_ids:
+            keys = self.by_role.get(role_id)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self.by_role[role_id]
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+
+                if time.monotonic() - self._last_prune > 3600:
+                    self._last_prune = time.monotonic()
+                    pruned = await self.prune()
+                    if pruned:
+                        log.info(f"Pruned {pruned} expired role snapshot(s)")
+            except Exception as e:
+                log.error(f"Error in role snapshot flush loop: {e}")
@@ -0,0 +1,101 @@
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+
+class VoiceMasterRegistry:
+    def __init__(self):
+        self.creation_channels: Dict[int, int] = {}
+        # guild_id -> {channel_id: owner_id}
+        self.channels: Dict[int, Dict[int, int]] = {}
+
+    def load_guild(self, guild_id: int, voicemaster_data: dict):
+        self.load_settings(guild_id, voicemaster_data)
+
+        channels = {
+            int(channel_id): int(data["Owner"])
+            for channel_id, data in voicemaster_data.get("Channels", {}).items()
+            if data.get("Owner")
+        }
+        if channels:
+            self.channels[guild_id] = channels
+        else:
+            self.channels.pop(guild_id, None)
+
+    def load_settings(self, guild_id: int, voicemaster_data: dict):
+        settings = voicemaster_data.get("Settings", {})
+        creation_channel_id = settings.get("Creation_Channel")
+
+        if creation_channel_id:
+            self.creation_channels[guild_id] = int(creation_channel_id)
+        else:
+            self.creation_channels.pop(guild_id, None)
+
+    def forget(self, guild_id: int):
+        self.creation_channels.pop(guild_id, None)
+        self.channels.pop(guild_id, None)
+
+    def is_active(self, guild_id: int) -> bool:
+        return guild_id in self.creation_channels or guild_id in self.channels
+
+    def creation_channel(self, guild_id: int) -> Optional[int]:
+        return self.creation_channels.get(guild_id)
+
+    def owner(self, guild_id: int, channel_id: int) -> Optional[int]:
+        return self.channels.get(guild_id, {}).get(channel_id)
+
+    def is_tracked(self, guild_id: int, channel_id: int) -> bool:
+        return channel_id in self.channels.get(guild_id, {})
+
+    def set_owner(self, guild_id: int, channel_id: int, owner_id: int) -> bool:
+        channels = self.channels.setdefault(guild_id, {})
+        if channels.get(channel_id) == owner_id:
+            return False
+        channels[channel_id] = owner_id
+        return True
+
+    def remove(self, guild_id: int, channel_id: int) -> bool:
+        channels = self.channels.get(guild_id)
+        if not channels or channels.pop(channel_id, None) is None:
+            return False
+        if not channels:
+            del self.channels[guild_id]
+        return True
+
+    def dump(self, guild_id: int, existing: dict) -> dict:
+        channels = {}
+        for channel_id, owner_id in self.channels.get(guild_id, {}).items():
+            entry = dict(existing.get(str(channel_id), {}))
+            entry["Owner"] = str(owner_id)
+            channels[str(channel_id)] = entry
+        return channels
+
+
+class RenameBudget:
+    # Discord allows two channel renames per channel every ten minutes.
+    def __init__(self, limit: int = 2, window: float = 600.0):
+        self.limit = limit
+        self.window = window
+        self.renames: Dict[int, Deque[float]] = {}
+
+    def _prune(self, channel_id: int) -> Deque[float]:
+        stamps = self.renames.get(channel_id)
+        if stamps is None:
+            return deque()
+
+        cutoff = time.monotonic() - self.window
+        while stamps and stamps[0] < cutoff:
+            stamps.popleft()
+        if not stamps:
+            del self.renames[channel_id]
+        return stamps
+
+    def allows(self, channel_id: int) -> bool:
+        return len(self._prune(channel_id)) < self.limit
+
+    def record(self, channel_id: int):
+        self._prune(channel_id)
+        self.renames.setdefault(channel_id, deque()).append(time.monotonic())
+
+    def forget(self, channel_id: int):
+        self.renames.pop(channel_id, None)
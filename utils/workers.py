@@ -0,0 +1,76 @@
+import asyncio, logging
+from typing import Any, Awaitable, Callable, Iterable, List, Optional
+
+log = logging.getLogger("Workers")
+
+
+class WorkerPool:
+    def __init__(self, name: str, workers: int = 4, maxsize: int = 1000):
+        self.name = name
+        self.workers = workers
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"{self.name}-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    async def submit(self, func: Callable[..., Awaitable[Any]], *args, **kwargs):
+        await self.queue.put((func, args, kwargs))
+
+    def pending(self) -> int:
+        return self.queue.qsize()
+
+    async def _worker(self):
+        while True:
+            func, args, kwargs = await self.queue.get()
+            try:
+                await func(*args, **kwargs)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error(f"{self.name} job {getattr(func, '__name__', func)} failed: {e}")
+            finally:
+                self.queue.task_done()
+
+
+async def run_bounded(
+    items: Iterable[Any],
+    func: Callable[[Any], Awaitable[Any]],
+    limit: int = 5,
+    on_progress: Optional[Callable[[int], Awaitable[Any]]] = None,
+    progress_every: int = 25,
+) -> List[Any]:
+    """Run func over items with at most `limit` in flight; failures are returned, not raised."""
+    semaphore = asyncio.Semaphore(limit)
+    done = 0
+
+    async def run(item):
+        nonlocal done
+        async with semaphore:
+            try:
+                result = await func(item)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                result = e
+
+        done += 1
+        if on_progress and done % progress_every == 0:
+            try:
+                await on_progress(done)
+            except Exception as e:
+                log.debug(f"Progress callback failed: {e}")
+
+        return result
+
+    return await asyncio.gather(*(run(item) for item in items))